@@ -1,12 +1,261 @@
+import threading
+import time
+from collections import deque
+from math import gcd
+
 import sounddevice as sd
 import numpy as np
+from scipy.signal import resample_poly
+
+WAIT_SLACK_SEC = 1.0  # 예상 재생 종료 시각 이후 이만큼 더 기다려도 안 끝나면 스트림이 멈춘 것으로 봄
+
+
+class AudioOutError(RuntimeError):
+    """출력 스트림이 멈춰서 재생이 끝나지 않음"""
+
+
+class Playback:
+    """AudioOutService.play()가 돌려주는 재생 핸들"""
+
+    __slots__ = ("audio", "done", "cancelled", "deadline", "gen")
+
+    def __init__(self, audio: np.ndarray, deadline: float = 0.0):
+        self.audio = audio
+        self.done = threading.Event()  # 다 재생했거나 취소되면 set
+        self.cancelled = False
+        self.gen = 0  # 예약할 때의 flush 세대 (flush() 이전에 예약된 재생만 버림)
+        self.deadline = deadline  # time.monotonic() 기준, 앞에 예약된 소리 + 이 소리 길이 + WAIT_SLACK_SEC
+
+    def wait(self, timeout=None) -> bool:
+        """
+        재생이 끝나면 True, timeout이 먼저 지나면 False
+        - deadline이 지나도 안 끝나면(콜백이 멈춤) 이 재생을 취소하고 AudioOutError
+          (timeout=None이어도 deadline까지만 기다림)
+        """
+        remaining = self.deadline - time.monotonic()
+        if timeout is not None and timeout < remaining:
+            return self.done.wait(timeout)
+        if self.done.wait(max(remaining, 0.0)):
+            return True
+        self.cancelled = True
+        self.done.set()
+        raise AudioOutError(f"재생이 {WAIT_SLACK_SEC:.1f}s 넘게 늦어지고 있습니다 (출력 스트림 멈춤)")
+
+
+class StreamResampler:
+    """
+    청크 단위로 이어지는 resample_poly (스트리밍 TTS 청크를 하나씩 변환해도 경계에서 딸깍 소리가 나지 않음)
+    - 앞뒤로 필터 길이만큼 입력을 겹쳐서 계산하고 겹친 부분의 출력은 버림
+      -> 전체를 한 번에 resample_poly 한 결과와 같음, 대신 pad 샘플(수 ms)만큼 늦게 나옴
+    - 마지막에 process(빈 배열, final=True)로 남은 입력을 내보냄
+    """
+
+    def __init__(self, sr_in: int, sr_out: int):
+        g = gcd(int(sr_in), int(sr_out))
+        self.up, self.down = int(sr_out) // g, int(sr_in) // g
+        half = -(-10 * max(self.up, self.down) // self.up) + 1  # resample_poly 필터 반쪽 길이 (입력 샘플)
+        self.pad = -(-half // self.down) * self.down  # down의 배수 -> 출력 경계가 정수
+        self._buf = np.zeros(self.pad, dtype=np.float32)
+
+    def process(self, chunk: np.ndarray, final: bool = False) -> np.ndarray:
+        buf = np.concatenate([self._buf, np.asarray(chunk, dtype=np.float32).reshape(-1)])
+        pad, up, down = self.pad, self.up, self.down
+        if final:
+            self._buf = np.zeros(pad, dtype=np.float32)
+            return resample_poly(buf, up, down)[pad * up // down:].astype(np.float32)
+        # 뒤쪽 pad만큼은 다음 청크가 와야 정확하므로 남겨 둠
+        end = pad + (len(buf) - 2 * pad) // down * down
+        if end <= pad:
+            self._buf = buf
+            return np.zeros(0, dtype=np.float32)
+        out = resample_poly(buf[:end + pad], up, down)[pad * up // down:end * up // down]
+        self._buf = buf[end - pad:]
+        return out.astype(np.float32)
+
+
+class AudioOutService:
+    """
+    프로세스 전체에서 하나만 여는 출력 스트림
+    - sd.OutputStream을 한 번 열어 두고 콜백이 재생 대기열(deque)에서 버퍼를 이어서 꺼내 씀
+      (sd.play처럼 말할 때마다 장치를 열고 닫지 않음, 여러 스레드가 sd.play 전역 상태를 공유하지 않음)
+    - deque의 append/popleft는 원자적이므로 오디오 콜백에서 lock을 잡지 않음
+    - Kokoro(24kHz) 등 다른 샘플레이트는 장치 샘플레이트로 변환해서 넣음
+    - cancel(handle) / flush()는 다음 콜백(수 ms 이내)에서 바로 끊김
+      (flush()는 세대 번호를 올리기만 함 -> flush() 직후에 예약한 재생은 버려지지 않음)
+    - 장치 오류 등으로 스트림이 멈추면 다음 play()에서 다시 엶 (기다리던 쪽은 deadline에서 AudioOutError)
+    """
+
+    def __init__(self, samplerate: int = None, device=None, latency="low"):
+        if samplerate is None:
+            samplerate = sd.query_devices(device, "output")["default_samplerate"]
+        self.sr = int(samplerate)
+        self.device = device
+        self.latency = latency
+        self._queue = deque()
+        self._current = None
+        self._pos = 0
+        self._gen = 0  # flush()마다 +1, 콜백은 이보다 이전 세대의 재생을 버림
+        self._lock = threading.Lock()  # play()끼리 (스트림 재시작, 예상 종료 시각)
+        self._end_time = 0.0  # 예약된 소리가 모두 끝날 예상 시각 (time.monotonic())
+        self._open()
+
+    def _open(self):
+        self._stream = sd.OutputStream(
+            samplerate=self.sr, channels=1, dtype="float32",
+            device=self.device, latency=self.latency, callback=self._callback,
+        )
+        self._stream.start()
+
+    def _reopen(self):
+        """멈춘 스트림을 닫고 새로 엶 (남아 있던 재생은 모두 취소)"""
+        print("[AudioOut] 출력 스트림이 멈춰 있어 다시 엽니다.")
+        try:
+            self._stream.close()
+        except Exception as e:
+            print(f"[AudioOut] 스트림 닫기 실패: {e}")
+        self._drop_all()
+        self._end_time = 0.0
+        self._open()
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        gen = self._gen
+        filled = 0
+        while filled < frames:
+            if self._current is not None and self._current.gen < gen:
+                self._current.cancelled = True  # flush() 이전에 예약된 재생
+            if self._current is None or self._current.cancelled:
+                if self._current is not None:
+                    self._current.done.set()
+                try:
+                    self._current = self._queue.popleft()
+                except IndexError:
+                    self._current = None
+                    break
+                self._pos = 0
+                continue
+
+            buf = self._current.audio
+            n = min(frames - filled, len(buf) - self._pos)
+            out[filled:filled + n] = buf[self._pos:self._pos + n]
+            filled += n
+            self._pos += n
+            if self._pos >= len(buf):
+                self._current.done.set()
+                self._current = None
+        out[filled:] = 0.0
+
+    def _drop_all(self):
+        if self._current is not None:
+            self._current.cancelled = True
+            self._current.done.set()
+            self._current = None
+        while True:
+            try:
+                pb = self._queue.popleft()
+            except IndexError:
+                return
+            pb.cancelled = True
+            pb.done.set()
+
+    def _resample(self, audio: np.ndarray, sr: int) -> np.ndarray:
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        if sr == self.sr:
+            return audio
+        g = gcd(int(sr), self.sr)
+        return resample_poly(audio, self.sr // g, int(sr) // g).astype(np.float32)
+
+    def play(self, audio: np.ndarray, sr: int) -> Playback:
+        """재생 예약 (바로 반환), 앞서 예약한 소리가 끝나면 끊김 없이 이어서 재생"""
+        pb = Playback(self._resample(audio, sr))
+        if len(pb.audio) == 0:
+            pb.done.set()
+            return pb
+        with self._lock:
+            if not self._stream.active:
+                self._reopen()
+            now = time.monotonic()
+            self._end_time = max(self._end_time, now) + len(pb.audio) / self.sr
+            pb.deadline = self._end_time + WAIT_SLACK_SEC
+            pb.gen = self._gen
+            self._queue.append(pb)
+        return pb
+
+    def cancel(self, pb: Playback):
+        """재생 하나만 취소 (대기 중이면 건너뛰고, 재생 중이면 바로 끊음)"""
+        with self._lock:
+            if not (pb.cancelled or pb.done.is_set()):
+                # 재생하지 않을 나머지만큼 뒤에 예약할 재생의 deadline을 당김
+                left = len(pb.audio) - (self._pos if pb is self._current else 0)
+                self._end_time -= max(left, 0) / self.sr
+            pb.cancelled = True
+        if not self._stream.active:
+            pb.done.set()
+
+    def flush(self):
+        """재생 중 / 대기 중인 소리를 모두 취소 (이후에 play()한 소리는 그대로 재생)"""
+        with self._lock:
+            self._gen += 1
+            self._end_time = 0.0
+            if not self._stream.active:
+                self._drop_all()  # 콜백이 돌지 않으므로 여기서 바로 정리
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
+        self._drop_all()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_audio_out() -> AudioOutService:
+    """공용 출력 서비스 (처음 호출할 때 스트림을 엶)"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = AudioOutService()
+        return _service
 
 
 def play(audio: np.ndarray, sr: int):
     """
-    audio: float32 mono array
+    audio: float32 mono array (끝날 때까지 대기, 출력 스트림이 멈추면 AudioOutError)
     """
     if audio is None or len(audio) == 0:
         return
-    sd.play(audio, sr)
-    sd.wait()
+    get_audio_out().play(audio, sr).wait()
+
+
+def play_stream(chunks, sr: int):
+    """
+    chunks: float32 mono 청크를 내보내는 iterable (예: KokoroTTS.synthesize_stream())
+    - 청크가 나오는 대로 출력 대기열에 넣으므로 첫 청크부터 바로 재생, 이후 청크는 이어서 재생
+    - 반환: 첫 소리가 나기까지 걸린 시간(초), 청크가 하나도 없으면 None
+    - 마지막 청크의 예상 종료 시각 + WAIT_SLACK_SEC까지만 기다림 (넘으면 AudioOutError)
+    """
+    t0 = time.perf_counter()
+    out = get_audio_out()
+    # 청크마다 따로 변환하면 경계에서 필터가 끊기므로 상태를 이어 가는 변환기 하나로
+    resampler = StreamResampler(sr, out.sr) if int(sr) != out.sr else None
+    first_audio, last = None, None
+    for chunk in chunks:
+        if chunk is None or len(chunk) == 0:
+            continue
+        if resampler is not None:
+            chunk = resampler.process(chunk)
+            if len(chunk) == 0:
+                continue
+        last = out.play(chunk, out.sr)
+        if first_audio is None:
+            first_audio = time.perf_counter() - t0
+    if resampler is not None:
+        tail = resampler.process(np.zeros(0, dtype=np.float32), final=True)
+        if len(tail):
+            last = out.play(tail, out.sr)
+            if first_audio is None:
+                first_audio = time.perf_counter() - t0
+    if last is not None:
+        last.wait()
+    return first_audio
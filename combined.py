@@ -1,17 +1,16 @@
 import os
 import csv
-import json
 import re
 import time
 import queue
 import threading
 import sys
+from collections import deque
 from datetime import datetime
 from time import perf_counter
 
 import numpy as np
 import sounddevice as sd
-import whisper
 
 # === [Imports] ===
 # src 폴더가 없거나 경로가 다르면 수정 필요
@@ -21,7 +20,13 @@ try:
     import rtde_receive
     from src.minilm import MiniLMRetriever
     from src.router import IntentRouter
-    from src.briefing import BriefingSystem
+    from src.briefing import BriefingSystem, PRIORITY_SAFETY
+    from src.asr_engine import load_asr_engine
+    from src.kws import KeywordSpotter
+    from src.keywords import KeywordMatcher, safety_category
+    from src.robot_safety import RTDE_LOCK, safe_stop
+    from src.startup import Startup, preimport
+    from src.warmup import warm_up
 except ImportError as e:
     print(f"오류: 필수 모듈을 불러올 수 없습니다. {e}")
     sys.exit(1)
@@ -32,6 +37,7 @@ except ImportError as e:
 SAMPLE_RATE = 16000
 INPUT_DEVICE = 1  # 마이크 장치 번호 (안 되면 None)
 WHISPER_MODEL = ("small")
+ASR_BACKEND = "whisper"  # "whisper" (openai-whisper) / "ct2" (CPU int8)
 
 # [VAD 설정: 말 끊김 감지]
 CHUNK_MS = 30
@@ -39,6 +45,13 @@ ENERGY_THRESHOLD = 0.012
 MIN_SPEECH_SEC = 0.25
 END_SILENCE_SEC = 0.55  # 이 시간만큼 조용하면 말이 끝난 것으로 간주
 MAX_UTT_SEC = 4.5
+PRE_ROLL_SEC = 0.15  # 말 시작 직전 오디오를 이만큼 붙여서 첫 음절 잘림 방지
+ASR_QUEUE_SIZE = 4  # 전사 대기 발화 최대 개수 (넘치면 가장 오래된 일반 발화를 버림, 안전 발화는 버리지 않음)
+SAFETY_RMS = 0.15  # 청크 RMS가 이보다 큰(외치는) 발화는 KWS 검출 발화처럼 안전 발화로 취급
+
+# [추측 전사: 짧은 침묵에서 미리 위스퍼 시작]
+SPECULATIVE_ASR = True
+SPEC_SILENCE_SEC = 0.2  # 이만큼 조용하면 일단 전사 시작, END_SILENCE_SEC에서 확정 / 말이 이어지면 취소
 
 # [로봇 설정]
 HOST = "192.168.0.61"
@@ -48,18 +61,20 @@ XYZ_LIMITS = {"x": (-1.0, 1.0), "y": (-1.0, 1.0), "z": (0.0, 1.2)}
 
 # [데이터 파일]
 INTENT_BANK_PATH = "data/intent_bank_JH.json"
+MINILM_BACKEND = "torch"  # "torch" / "onnx" (int8, python -m src.onnx_encoder export 필요)
+KWS_TEMPLATE_PATH = "data/kws_templates.npz"  # python -m src.kws enroll STOP 으로 생성
 THRESHOLD = 0.55
 
 # [키워드]
-STOP_KEYWORDS = ["stop", "pause", "hold on", "wait", "halt", "freeze", "emergency"]
-START_KEYWORDS = ["start", "begin", "continue", "go", "resume", "arm"]
-PAIN_KEYWORDS = ["it hurts", "hurt", "pain", "ouch"]
+# 안전 키워드(PAIN/STOP/START)는 src/keywords.py (voice_stop.py와 같은 목록)
 
 DIR_WORDS = {
     "up": ("z", +1), "down": ("z", -1),
     "left": ("y", +1), "right": ("y", -1),
     "forward": ("x", +1), "back": ("x", -1), "backward": ("x", -1),
 }
+# 방향 단어 하나당 카테고리 하나 (DIR_WORDS 순서가 우선순위)
+DIR_MATCHER = KeywordMatcher({w: [w] for w in DIR_WORDS})
 
 
 # ======================
@@ -70,6 +85,7 @@ class MetricsCSV:
         os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
         self.path = path
         self.f = open(path, "w", newline="", encoding="utf-8-sig")
+        self.lock = threading.Lock()  # 키워드 스포터(VAD 스레드)와 메인 루프가 같이 기록
 
         # ▼ 사용자가 원하는 데이터 컬럼 정의
         self.fields = [
@@ -77,6 +93,7 @@ class MetricsCSV:
             "event_type",  # 이벤트 타입 (Safety, AI_Intent, Rule_Move...)
             "text",  # 인식된 텍스트
             "asr_time",  # 위스퍼가 글자로 바꾸는 데 걸린 시간
+            "asr_wait",  # 말 끝남 판단 ~ 위스퍼 시작까지 큐에서 기다린 시간
             "total_latency",  # ★ [핵심] 말 끝남 ~ 로봇 동작 시작까지 걸린 시간
             "description"  # 상세 설명
         ]
@@ -84,17 +101,19 @@ class MetricsCSV:
         self.w.writeheader()
         self.f.flush()
 
-    def log(self, event_type, text, asr_time, total_latency, description):
+    def log(self, event_type, text, asr_time, total_latency, description, asr_wait=""):
         row = {
             "timestamp": datetime.now().strftime('%H:%M:%S.%f')[:-3],
             "event_type": event_type,
             "text": text,
             "asr_time": asr_time,
+            "asr_wait": asr_wait,
             "total_latency": total_latency,
             "description": description
         }
-        self.w.writerow(row)
-        self.f.flush()
+        with self.lock:
+            self.w.writerow(row)
+            self.f.flush()
 
     def close(self):
         try:
@@ -106,20 +125,157 @@ class MetricsCSV:
 # ======================
 # 2. 실시간 리스너 (시간 측정 기능 추가)
 # ======================
+class UtteranceBuffer:
+    """
+    발화 누적용 고정 크기 float32 버퍼
+    - 청크를 미리 할당된 배열에 그대로 복사 (np.concatenate 재할당 없음)
+    - 말하기 전 구간은 pre-roll 링 버퍼에 계속 덮어쓰다가 발화 시작 시 앞에 붙임
+    - view()는 복사 없이 현재 발화 구간을 돌려줌
+    """
+
+    def __init__(self, capacity: int, pre_roll: int = 0):
+        self.capacity = capacity
+        self.pre_roll = pre_roll
+        self._buf = np.zeros(capacity + pre_roll, dtype=np.float32)
+        self._len = 0
+        self._head = 0  # 버퍼 앞에 붙은 pre-roll 길이
+        self._ring = np.zeros(max(pre_roll, 1), dtype=np.float32)
+        self._ring_pos = 0
+        self._ring_len = 0
+
+    def __len__(self):
+        return self._len
+
+    def push_pre_roll(self, chunk: np.ndarray):
+        """발화 전 청크를 링 버퍼에 기록 (가장 최근 pre_roll 샘플만 유지)"""
+        if self.pre_roll == 0:
+            return
+        chunk = chunk[-self.pre_roll:]
+        n = len(chunk)
+        end = self._ring_pos + n
+        if end <= self.pre_roll:
+            self._ring[self._ring_pos:end] = chunk
+        else:
+            first = self.pre_roll - self._ring_pos
+            self._ring[self._ring_pos:] = chunk[:first]
+            self._ring[:n - first] = chunk[first:]
+        self._ring_pos = end % self.pre_roll
+        self._ring_len = min(self._ring_len + n, self.pre_roll)
+
+    def begin(self):
+        """발화 시작: pre-roll 내용을 시간 순서대로 버퍼 앞에 복사"""
+        n = self._ring_len
+        start = (self._ring_pos - n) % max(self.pre_roll, 1)
+        if start + n <= self.pre_roll:
+            self._buf[:n] = self._ring[start:start + n]
+        else:
+            first = self.pre_roll - start
+            self._buf[:first] = self._ring[start:]
+            self._buf[first:n] = self._ring[:n - first]
+        self._len = n
+        self._head = n
+        self._ring_len = 0
+
+    def append(self, chunk: np.ndarray):
+        """청크를 제자리에 기록 (용량 초과분은 잘라냄)"""
+        n = min(len(chunk), len(self._buf) - self._len)
+        self._buf[self._len:self._len + n] = chunk[:n]
+        self._len += n
+
+    def speech_len(self):
+        """pre-roll을 제외한 실제 누적 길이"""
+        return self._len - self._head
+
+    def is_full(self):
+        return self._len >= len(self._buf)
+
+    def view(self) -> np.ndarray:
+        """현재 발화 구간 (zero-copy view, reset 전까지만 유효)"""
+        return self._buf[:self._len]
+
+    def reset(self):
+        self._len = 0
+        self._head = 0
+
+
+class UtteranceQueue:
+    """
+    VAD -> ASR 발화 대기열 (deque + Condition, 크기 제한과 버리는 규칙이 있음)
+    - 꽉 찬 상태에서 put()하면 가장 오래된 일반 발화(새 발화 포함)를 버림
+      -> 로봇 명령은 최신 발화가 중요하므로 몇 초 지난 명령이 늦게 실행되지 않게 함
+    - 안전 발화(job["safety"], KWS/큰 소리)는 버리지 않음 (전부 안전 발화면 크기를 넘겨서라도 넣음)
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._cv = threading.Condition()
+
+    def __len__(self):
+        with self._cv:
+            return len(self._items)
+
+    def put(self, job):
+        """넣고, 버린 발화가 있으면 반환 (없으면 None)"""
+        with self._cv:
+            self._items.append(job)
+            dropped = None
+            if len(self._items) > self.maxsize:
+                dropped = next((j for j in self._items if not j["safety"]), None)
+                if dropped is not None:
+                    self._items.remove(dropped)
+            self._cv.notify()
+            return dropped
+
+    def get(self, timeout=None):
+        """가장 오래된 발화 (timeout 안에 없으면 queue.Empty)"""
+        with self._cv:
+            if not self._cv.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            return self._items.popleft()
+
+
 class RealtimeWhisper:
-    def __init__(self, asr_model, sample_rate=16000, input_device=None):
-        self.asr = asr_model
+    """
+    마이크 입력 -> VAD(발화 분할) 스레드 -> ASR 워커 스레드 -> listen_texts()
+    - 위스퍼가 도는 동안에도 VAD는 계속 다음 발화를 잘라냄
+    - 분할된 발화는 크기가 제한된 큐로 ASR 워커에 전달, 결과는 들어온 순서대로 반환
+    - speculative=True면 SPEC_SILENCE_SEC 침묵에서 미리 전사하고,
+      END_SILENCE_SEC까지 조용하면 확정 / 그 전에 말이 이어지면 버리고 다시 시작
+    - kws가 있으면 VAD 스레드에서 모든 청크를 키워드 스포터에 넣고,
+      STOP/PAIN이 검출되면 위스퍼를 기다리지 않고 바로 on_keyword(label, dist, utt_id) 호출
+    - 발화마다 utt_id(1부터 증가)를 붙여서 결과에도 넣음 -> KWS 검출을 같은 발화의 전사로만 확인
+    """
+
+    def __init__(self, asr_engine, sample_rate=16000, input_device=None, speculative=SPECULATIVE_ASR,
+                 kws=None, on_keyword=None, metrics=None):
+        self.asr = asr_engine  # src.asr_engine.ASREngine
+        self.metrics = metrics  # MetricsCSV (큐가 넘쳐 버린 발화 기록)
+        self.kws = kws  # src.kws.KeywordSpotter
+        self.on_keyword = on_keyword
+        self.speculative = speculative
         self.sr = sample_rate
         self.device = input_device
         self.q = queue.Queue()
+        self.utt_q = UtteranceQueue(ASR_QUEUE_SIZE)  # VAD -> ASR
+        self.result_q = queue.Queue()  # ASR -> listen_texts
         self.stop_event = threading.Event()
         self._stream = None
+        self._threads = []
 
         # 프레임 계산
         self.chunk_frames = int(self.sr * (CHUNK_MS / 1000.0))
         self.min_speech_frames = int(self.sr * MIN_SPEECH_SEC)
         self.end_silence_frames = int(self.sr * END_SILENCE_SEC)
+        self.spec_silence_frames = int(self.sr * SPEC_SILENCE_SEC)
         self.max_utt_frames = int(self.sr * MAX_UTT_SEC)
+        self.pre_roll_frames = int(self.sr * PRE_ROLL_SEC)
+
+        # 최대 발화 + 끝 침묵 + 여유 청크 2개 (침묵 구간은 길이 체크 없이 붙기 때문)
+        self.utt_buf = UtteranceBuffer(
+            self.max_utt_frames + self.end_silence_frames + 2 * self.chunk_frames,
+            pre_roll=self.pre_roll_frames,
+        )
 
     def _audio_cb(self, indata, frames, time_info, status):
         if status: print("[AUDIO ERROR]", status)
@@ -134,17 +290,76 @@ class RealtimeWhisper:
         )
         self._stream.start()
 
+        self._threads = [
+            threading.Thread(target=self._segment_loop, name="vad", daemon=True),
+            threading.Thread(target=self._asr_loop, name="asr", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
     def stop(self):
         self.stop_event.set()
         if self._stream:
             self._stream.stop()
             self._stream.close()
+        for t in self._threads:
+            t.join(timeout=2.0)
 
     def listen_texts(self):
-        """음성을 감지하여 텍스트와 '말이 끝난 시간'을 반환"""
+        """인식 결과(텍스트, 말 끝난 시각, 분할/ASR 시각)를 발화 순서대로 반환"""
+        while not self.stop_event.is_set():
+            try:
+                yield self.result_q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+    def _dispatch(self, audio_1d: np.ndarray, voice_end_time: float, utt_id: int, speculative=False, safety=False):
+        """분할된 발화를 ASR 큐에 넣음 (버퍼는 재사용되므로 여기서 한 번 복사)"""
+        job = {
+            "utt_id": utt_id,
+            "safety": safety,  # KWS 검출/큰 소리 발화 -> 큐가 넘쳐도 버리지 않음
+            "audio": audio_1d.copy(),
+            "voice_end_time": voice_end_time,
+            "seg_time": time.time(),  # 분할 완료(큐 투입) 시각
+            "speculative": speculative,
+            "decided": threading.Event(),  # 추측 전사: 확정/취소가 정해지면 set
+            "keep": not speculative,
+        }
+        if not speculative:
+            job["decided"].set()
+        self._enqueue(job)
+        return job
+
+    def _enqueue(self, job):
+        """ASR 큐에 넣고, 넘쳐서 버린 발화는 기록 (버리는 규칙은 UtteranceQueue)"""
+        dropped = self.utt_q.put(job)
+        if dropped is not None:
+            desc = f"utt {dropped['utt_id']} dropped (ASR queue full)"
+            if self.metrics:
+                self.metrics.log("ASR_Drop", "-", "-", "-", desc)
+            else:
+                print(f"[ASR] {desc}")
+
+    @staticmethod
+    def _decide(job, keep: bool):
+        """추측 전사 결과를 확정(keep=True) 또는 취소"""
+        job["keep"] = keep
+        job["decide_time"] = time.time()
+        job["decided"].set()
+
+    def _segment_loop(self):
+        """VAD 스레드: 청크를 받아 발화 단위로 잘라 ASR 큐로 보냄"""
         in_speech = False
-        utt = np.zeros((0,), dtype=np.float32)
+        utt = self.utt_buf
+        utt.reset()
         silence = 0
+        spec_job = None  # 현재 확정을 기다리는 추측 전사
+        utt_id = 0  # 마지막으로 시작된 발화 번호
+        kws_utt = 0  # KWS가 마지막으로 검출된 발화 번호
+        peak_rms = 0.0  # 현재 발화의 최대 청크 RMS
+
+        def is_safety():
+            return kws_utt == utt_id or peak_rms >= SAFETY_RMS
 
         while not self.stop_event.is_set():
             try:
@@ -155,46 +370,107 @@ class RealtimeWhisper:
             rms = float(np.sqrt(np.mean(chunk * chunk) + 1e-12))
             is_speech = rms > ENERGY_THRESHOLD
 
+            # 비상 정지 키워드는 발화 분할/위스퍼와 상관없이 청크마다 바로 확인
+            if self.kws is not None:
+                hit = self.kws.process(chunk)
+                if hit and self.on_keyword:
+                    # 이 청크에서 새 발화가 시작되면 그 발화, 아니면 진행 중(또는 방금 끝난) 발화
+                    hit_utt = kws_utt = utt_id + 1 if (is_speech and not in_speech) else utt_id
+                    try:
+                        self.on_keyword(*hit, hit_utt)
+                    except Exception as e:
+                        print(f"[KWS ERROR] {e}")
+
             if is_speech:
+                if spec_job is not None:
+                    # 말이 다시 이어짐 -> 추측 전사 취소 (다음 침묵에서 다시 시작)
+                    self._decide(spec_job, keep=False)
+                    spec_job = None
+                if not in_speech:
+                    utt.begin()
+                    utt_id += 1
+                    peak_rms = 0.0
+                peak_rms = max(peak_rms, rms)
                 in_speech = True
                 silence = 0
-                utt = np.concatenate([utt, chunk])
+                utt.append(chunk)
 
                 # 너무 길면 강제 종료
-                if len(utt) > self.max_utt_frames:
+                if utt.speech_len() > self.max_utt_frames or utt.is_full():
                     voice_end_time = time.time()  # 강제 종료 시점
-                    result = self._transcribe_utt(utt, voice_end_time)
-                    if result: yield result
-                    utt = np.zeros((0,), dtype=np.float32)
+                    self._dispatch(utt.view(), voice_end_time, utt_id, safety=is_safety())
+                    utt.reset()
                     in_speech = False
             else:
                 if in_speech:
                     silence += len(chunk)
-                    utt = np.concatenate([utt, chunk])
+                    utt.append(chunk)
+
+                    # 짧은 침묵: 말이 끝났다고 가정하고 미리 전사 시작
+                    if (self.speculative and spec_job is None
+                            and silence >= self.spec_silence_frames
+                            and utt.speech_len() >= self.min_speech_frames):
+                        voice_end_time = time.time() - silence / self.sr
+                        spec_job = self._dispatch(utt.view(), voice_end_time, utt_id, speculative=True,
+                                                  safety=is_safety())
 
                     # 조용함이 지속되면 말 끝남 판단
                     if silence >= self.end_silence_frames:
-                        if len(utt) >= self.min_speech_frames:
+                        if spec_job is not None:
+                            self._decide(spec_job, keep=True)
+                            spec_job = None
+                        elif utt.speech_len() >= self.min_speech_frames:
                             # ★ [핵심] 말이 정확히 끝난 시점 기록
                             # 현재 시간에서 침묵 시간(END_SILENCE_SEC)을 뺌
                             voice_end_time = time.time() - END_SILENCE_SEC
+                            self._dispatch(utt.view(), voice_end_time, utt_id, safety=is_safety())
 
-                            result = self._transcribe_utt(utt, voice_end_time)
-                            if result: yield result
-
-                        utt = np.zeros((0,), dtype=np.float32)
+                        utt.reset()
                         in_speech = False
                         silence = 0
+                else:
+                    utt.push_pre_roll(chunk)
+
+    def _asr_loop(self):
+        """ASR 워커 스레드: 큐에 들어온 순서대로 전사"""
+        while not self.stop_event.is_set():
+            try:
+                job = self.utt_q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if job["decided"].is_set() and not job["keep"]:
+                continue  # 시작 전에 취소된 추측 전사
+
+            asr_start_time = time.time()
+            try:
+                result = self._transcribe_utt(job["audio"], job["voice_end_time"])
+            except Exception as e:
+                print(f"[ASR ERROR] {e}")
+                continue
+            asr_end_time = time.time()
+
+            # 추측 전사는 침묵이 확정될 때까지 결과를 내보내지 않음
+            while not job["decided"].wait(timeout=0.05):
+                if self.stop_event.is_set(): return
+            if not job["keep"]:
+                print("[ASR] 말이 이어져서 추측 전사를 버립니다.")
+                continue
+            if not result: continue
+
+            result["utt_id"] = job["utt_id"]
+            result["speculative"] = job["speculative"]
+            result["seg_time"] = job["seg_time"]
+            result["asr_start_time"] = asr_start_time
+            result["asr_end_time"] = asr_end_time
+            result["asr_wait"] = asr_start_time - job["seg_time"]
+            self.result_q.put(result)
 
     def _transcribe_utt(self, audio_1d: np.ndarray, voice_end_time: float):
         """Whisper 변환 및 시간 정보 패키징"""
         t0 = perf_counter()
 
         # Whisper 추론
-        res = self.asr.transcribe(
-            audio_1d, language="en", fp16=False,
-            beam_size=1, best_of=1, temperature=0.0
-        )
+        res = self.asr.transcribe(audio_1d)
 
         t1 = perf_counter()
         asr_duration = t1 - t0  # 순수 추론 시간
@@ -212,26 +488,16 @@ class RealtimeWhisper:
 # ======================
 # 3. 로봇 제어 및 헬퍼 함수
 # ======================
-def load_intent_bank(path: str):
-    with open(path, "r", encoding="utf-8") as f: return json.load(f)
-
-
 def override_safety(text: str):
-    t = text.lower()
-    if any(k in t for k in PAIN_KEYWORDS): return "PAIN"
-    if any(k in t for k in STOP_KEYWORDS): return "STOP"
-    if any(k in t for k in START_KEYWORDS): return "START"
-    return None
+    # PAIN > STOP > START
+    return safety_category(text)
 
 
 def parse_move_command(text: str):
     t = text.lower()
-    found_dir = None
-    for w in DIR_WORDS.keys():
-        if re.search(rf"\b{w}\b", t):
-            found_dir = w
-            break
-    if not found_dir: return None
+    hit = DIR_MATCHER.first(t)
+    if not hit: return None
+    found_dir = hit.category
 
     dist = 0.05
     m = re.search(r"(\d+(\.\d+)?)\s*(cm|centimeter)", t)
@@ -249,13 +515,6 @@ def parse_move_command(text: str):
     return dx, dy, dz, found_dir
 
 
-def safe_stop(rtde_c):
-    try:
-        rtde_c.stopL(2.0)
-    except:
-        rtde_c.stopJ(2.0)
-
-
 def moveL_delta(rtde_c, rtde_r, dx, dy, dz, speed, acc):
     pose = rtde_r.getActualTCPPose()
     target = list(pose)
@@ -266,7 +525,8 @@ def moveL_delta(rtde_c, rtde_r, dx, dy, dz, speed, acc):
     target[0] = max(XYZ_LIMITS["x"][0], min(XYZ_LIMITS["x"][1], target[0]))
     target[1] = max(XYZ_LIMITS["y"][0], min(XYZ_LIMITS["y"][1], target[1]))
     target[2] = max(XYZ_LIMITS["z"][0], min(XYZ_LIMITS["z"][1], target[2]))
-    rtde_c.moveL(target, speed, acc, True)
+    with RTDE_LOCK:  # KWS 정지(VAD 스레드)와 겹치지 않게 (src/robot_safety.py)
+        rtde_c.moveL(target, speed, acc, True)
 
 
 def handle_intent_briefing(intent, rtde_c, rtde_r, state, briefing):
@@ -276,7 +536,7 @@ def handle_intent_briefing(intent, rtde_c, rtde_r, state, briefing):
     if intent == "STOP":
         safe_stop(rtde_c)
         state["armed"] = False
-        briefing.announce("Stopping.")
+        briefing.announce("Stopping.", priority=PRIORITY_SAFETY)
         return "Emergency Stop"
 
     if intent == "PAIN":
@@ -284,7 +544,7 @@ def handle_intent_briefing(intent, rtde_c, rtde_r, state, briefing):
         time.sleep(0.1)
         moveL_delta(rtde_c, rtde_r, 0, 0, 0.05, BASE_SPEED, BASE_ACC)
         state["armed"] = False
-        briefing.announce("Backing off.")
+        briefing.announce("Backing off.", priority=PRIORITY_SAFETY)
         return "Pain Reaction"
 
     if intent == "START":
@@ -311,40 +571,84 @@ def handle_intent_briefing(intent, rtde_c, rtde_r, state, briefing):
 def main():
     listener = None
     rtde_c = None
+    router = None
+    asr = None
 
     # 로그 파일 생성
     log_name = f"logs/latency_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     metrics = MetricsCSV(log_name)
-    briefing = BriefingSystem()
+    briefing = None
 
     try:
-        print(">>> [INIT] Loading Whisper...")
-        asr = whisper.load_model(WHISPER_MODEL)
+        # 서로 독립적인 모델 로드 / 로봇 연결을 동시에 시작하고 모두 끝날 때까지 대기
+        print(f">>> [INIT] Loading Whisper ({ASR_BACKEND}), MiniLM, Kokoro + Connecting to Robot ({HOST})...")
+        # 라이브러리 import는 메인 스레드에서 먼저 (풀 스레드에서 동시에 import하면 transformers lazy import가 꼬임)
+        preimport(*(["torch", "whisper"] if ASR_BACKEND == "whisper" else ["faster_whisper"]),
+                  *(["torch", "sentence_transformers"] if MINILM_BACKEND == "torch" else ["onnxruntime"]))
+        startup = Startup()
+        startup.add("whisper", load_asr_engine, WHISPER_MODEL, backend=ASR_BACKEND, language="en")
+        startup.add("minilm", MiniLMRetriever.from_bank_file, INTENT_BANK_PATH, backend=MINILM_BACKEND)
+        startup.add("kokoro", BriefingSystem, phrases=[f"Moving {d}." for d in DIR_WORDS])
+        startup.add("kws", KeywordSpotter.load, KWS_TEMPLATE_PATH)
+        startup.add("rtde_c", rtde_control.RTDEControlInterface, HOST)
+        startup.add("rtde_r", rtde_receive.RTDEReceiveInterface, HOST)
+        parts = startup.wait()
+
+        asr, retriever, briefing = parts["whisper"], parts["minilm"], parts["kokoro"]
+        rtde_c, rtde_r, kws = parts["rtde_c"], parts["rtde_r"], parts["kws"]
 
-        print(">>> [INIT] Loading MiniLM & Router...")
-        bank = load_intent_bank(INTENT_BANK_PATH)
-        retriever = MiniLMRetriever(bank)
         router = IntentRouter(retriever, threshold=THRESHOLD)
+        # 뱅크 파일을 고치면 재시작 없이 바뀐 문장만 다시 인코딩해서 교체
+        retriever.watch(INTENT_BANK_PATH)
+
+        # 첫 명령이 느리지 않도록 더미 입력으로 한 번씩 미리 추론 (cold/warm 시간은 CSV에도 기록)
+        warm_up(
+            {"whisper": asr.warmup, "minilm": retriever.warmup, "kokoro": briefing.warmup},
+            log=lambda name, cold, warm: metrics.log("Warmup", name, "-", "-",
+                                                     f"cold {cold:.3f}s / warm {warm:.3f}s"),
+        )
+
+        state = {"armed": False, "speed_scale": 1.0, "kws_pending": None}
 
-        print(f">>> [INIT] Connecting to Robot ({HOST})...")
-        rtde_c = rtde_control.RTDEControlInterface(HOST)
-        rtde_r = rtde_receive.RTDEReceiveInterface(HOST)
+        if kws is None:
+            print(f">>> [INIT] KWS 템플릿 없음 ({KWS_TEMPLATE_PATH}) - Whisper 경로로만 정지")
+
+        def on_keyword(label, dist, utt_id):
+            """키워드 스포터 검출: 위스퍼 없이 바로 정지, 확인은 같은 발화(utt_id)의 위스퍼 결과로"""
+            t0 = time.time()
+            with RTDE_LOCK:  # 메인 스레드의 이동 명령과 겹치지 않게
+                state["armed"] = False
+                safe_stop(rtde_c)
+            state["kws_pending"] = {"label": label, "utt_id": utt_id}
+            stop_latency = time.time() - t0
+            metrics.log("KWS_Stop", label, "-", f"{stop_latency:.3f}", f"{label} (dist {dist:.2f})")
+            print(f"\n⚡ KWS: {label} (dist {dist:.2f}) -> Stop")
 
-        state = {"armed": False, "speed_scale": 1.0}
         briefing.announce("Ready to start.")
         print("\n=== System Ready (Say 'Start' to begin) ===\n")
 
         # 리스너 시작
-        listener = RealtimeWhisper(asr)
+        listener = RealtimeWhisper(asr, kws=kws, on_keyword=on_keyword, metrics=metrics)
         listener.start()
 
         for res in listener.listen_texts():
             text = res["text"]
             asr_time = res["asr_time"]  # 위스퍼 처리 시간 (초)
             voice_end_time = res["voice_end_time"]  # 말이 끝난 시각 (절대시간)
+            asr_wait = f"{res['asr_wait']:.3f}"  # ASR 큐 대기 시간 (초)
 
             print(f"\n🗣️ User: '{text}'")
 
+            # 키워드 스포터로 이미 정지했으면 같은 발화의 위스퍼 결과로 확인만 기록
+            # (앞선 발화의 결과는 건너뛰고, 그 발화가 전사 없이 지나갔으면 미확인으로 기록)
+            pending = state["kws_pending"]
+            if pending and res["utt_id"] >= pending["utt_id"]:
+                same_utt = res["utt_id"] == pending["utt_id"]
+                confirmed = same_utt and override_safety(text) in ("STOP", "PAIN")
+                metrics.log("KWS_Confirm" if confirmed else "KWS_Unconfirmed", text if same_utt else "(no transcript)",
+                            f"{asr_time:.3f}", "-", pending["label"], asr_wait=asr_wait)
+                state["kws_pending"] = None
+
             # ---------------------------------------------------------
             # [A] Safety Override (최우선)
             # ---------------------------------------------------------
@@ -355,7 +659,7 @@ def main():
                 # ★ 지연시간 계산: (현재시각 - 말 끝난 시각)
                 total_latency = time.time() - voice_end_time
 
-                metrics.log("Safety_Override", text, f"{asr_time:.3f}", f"{total_latency:.3f}", desc)
+                metrics.log("Safety_Override", text, f"{asr_time:.3f}", f"{total_latency:.3f}", desc, asr_wait=asr_wait)
                 print(f"Latency: {total_latency:.3f}s (Action: {desc})")
                 continue
 
@@ -364,7 +668,7 @@ def main():
             # ---------------------------------------------------------
             if not state["armed"]:
                 print("Ignored (Not Armed)")
-                metrics.log("Ignored", text, f"{asr_time:.3f}", "-", "Not armed")
+                metrics.log("Ignored", text, f"{asr_time:.3f}", "-", "Not armed", asr_wait=asr_wait)
                 continue
 
             # ---------------------------------------------------------
@@ -375,14 +679,21 @@ def main():
                 dx, dy, dz, dname = move_data
                 spd = BASE_SPEED * state["speed_scale"]
 
-                # 로봇 명령 시작
-                moveL_delta(rtde_c, rtde_r, dx, dy, dz, spd, BASE_ACC)
+                # 로봇 명령 시작 (확인과 이동 사이에 KWS 정지가 끼어들 수 없도록 lock 안에서)
+                with RTDE_LOCK:
+                    moved = state["armed"]
+                    if moved:
+                        moveL_delta(rtde_c, rtde_r, dx, dy, dz, spd, BASE_ACC)
+                if not moved:
+                    print("Ignored (Stopped by KWS)")
+                    metrics.log("Ignored", text, f"{asr_time:.3f}", "-", "Stopped by KWS", asr_wait=asr_wait)
+                    continue
                 briefing.announce(f"Moving {dname}.")
 
                 # ★ 지연시간 계산
                 total_latency = time.time() - voice_end_time
 
-                metrics.log("Rule_Move", text, f"{asr_time:.3f}", f"{total_latency:.3f}", f"Move {dname}")
+                metrics.log("Rule_Move", text, f"{asr_time:.3f}", f"{total_latency:.3f}", f"Move {dname}", asr_wait=asr_wait)
                 print(f"Latency: {total_latency:.3f}s (Move {dname})")
                 continue
 
@@ -398,20 +709,26 @@ def main():
                 total_latency = time.time() - voice_end_time
 
                 metrics.log("AI_Intent", text, f"{asr_time:.3f}", f"{total_latency:.3f}",
-                            f"{intent} ({chosen['score']:.2f})")
+                            f"{intent} ({chosen['score']:.2f})", asr_wait=asr_wait)
                 print(f"⏱️ Latency: {total_latency:.3f}s (Intent: {intent})")
             else:
                 briefing.announce("Unknown command.")
-                metrics.log("Unknown", text, f"{asr_time:.3f}", "-", "Low confidence")
+                metrics.log("Unknown", text, f"{asr_time:.3f}", "-", "Low confidence", asr_wait=asr_wait)
                 print("Unknown command")
 
     except KeyboardInterrupt:
         print("\n🛑 Stopped by User")
-        briefing.announce("Shutting down.")
+        if briefing:
+            briefing.announce("Shutting down.")
+            briefing.wait_until_finished()
     except Exception as e:
         print(f"\n❌ Error: {e}")
     finally:
         if listener: listener.stop()
+        if router:
+            print(f"[Cache] {router.cache_info()}")
+            router.retriever.close()
+        if asr: asr.close()  # 공유 모델 참조 반환 (src/model_registry.py)
         if rtde_c:
             try:
                 rtde_c.stopL(); rtde_c.stopScript()
@@ -1,25 +1,22 @@
-import json
 import torch
 
 from src.minilm import MiniLMRetriever
 from src.router import IntentRouter
 
-def load_intent_bank(path="data/intent_bank.json"):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+INTENT_BANK_PATH = "data/intent_bank.json"
 
 def main():
     print("torch:", torch.__version__)
     print("cuda available:", torch.cuda.is_available())
     print("\n종료: q / quit / exit\n")
 
-    intent_bank = load_intent_bank()
-    retriever = MiniLMRetriever(intent_bank)
+    retriever = MiniLMRetriever.from_bank_file(INTENT_BANK_PATH)
     router = IntentRouter(retriever, threshold=0.55)
 
     while True:
         utt = input("환자 발화 > ").strip()
         if utt.lower() in ("q", "quit", "exit"):
+            print(f"[Cache] {router.cache_info()}")
             break
         if not utt:
             continue
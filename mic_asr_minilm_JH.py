@@ -1,19 +1,20 @@
-import json
 import numpy as np
 import sounddevice as sd
-import whisper
 import soundfile as sf
 from kokoro_onnx import Kokoro
 import os
 
 from src.minilm import MiniLMRetriever
 from src.router import IntentRouter
+from src.asr_engine import load_asr_engine
+from src.audio_out import play
 
 # ===== 마이크/ASR 설정 =====
 SAMPLE_RATE = 16000
 RECORD_SECONDS = 3.5 #한번에 듣는 시간
 INPUT_DEVICE = 1           # 너의 마이크. (WASAPI로 성공했으면 9로 바꾸기)
 WHISPER_MODEL = "base"  # 느리면 "tiny.en"
+ASR_BACKEND = "whisper"  # "whisper" / "ct2" (CPU int8)
 
 # ===== 의미 추론 설정 =====
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -38,11 +39,6 @@ RESPONSE_MESSAGES = {
 } #의도에 따라 로봇이 뭐라고 말할 지 정리해둔 딕셔너리
 
 
-def load_intent_bank(path: str):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-#json 파일을 딕셔너리로 변환하는 함수
-
 def record_audio(seconds: float) -> np.ndarray:
     print(f"[REC] Speak now ({seconds:.1f}s)...")
     audio = sd.rec(
@@ -76,20 +72,18 @@ def speak_text(tts_engine: Kokoro, text: str, voice="af_sarah"):
     try:
         samples, sr = tts_engine.create(text, voice=voice, speed=1.0, lang="en-us")
 
-    # 2. 재생 (sd.play는 비동기이므로 sd.wait()로 기다려줌)
-        sd.play(samples, samplerate=sr)
-        sd.wait()
+    # 2. 재생 (열어 둔 출력 스트림으로, 끝날 때까지 대기)
+        play(samples, sr)
     except Exception as e:
         print(e)
 
 
 def main():
-    print("[ASR] Loading Whisper:", WHISPER_MODEL)
-    asr = whisper.load_model(WHISPER_MODEL)
+    print("[ASR] Loading Whisper:", WHISPER_MODEL, f"({ASR_BACKEND})")
+    asr = load_asr_engine(WHISPER_MODEL, backend=ASR_BACKEND, language="en")
 
     print("[NLU] Loading MiniLM retriever + router...")
-    intent_bank = load_intent_bank(INTENT_BANK_PATH) #대본 읽기
-    retriever = MiniLMRetriever(intent_bank)   # sentence-transformers 기반
+    retriever = MiniLMRetriever.from_bank_file(INTENT_BANK_PATH)   # 컴파일된 뱅크(.bank.npz)가 있으면 바로 로드
     router = IntentRouter(retriever, threshold=THRESHOLD)
 
     print("[TTS] Loading Kokoro ONNX...")
@@ -114,7 +108,7 @@ def main():
 
         # 2) ASR (음성 -> 텍스트)
         print("[ASR] Transcribing...")
-        result = asr.transcribe(audio, language="en", fp16=False)
+        result = asr.transcribe(audio)
         text = (result.get("text") or "").strip()
         print("[TEXT]", text if text else "(empty)")
 
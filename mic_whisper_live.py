@@ -2,6 +2,8 @@ import numpy as np
 import sounddevice as sd
 import whisper
 
+from src.whisper_fast import ShortCommandDecoder
+
 # ===== 설정 =====
 SAMPLE_RATE = 16000
 RECORD_SECONDS = 3.5
@@ -27,6 +29,7 @@ def record_audio(seconds: float) -> np.ndarray:
 def main():
     print("[ASR] loading whisper:", WHISPER_MODEL)
     model = whisper.load_model(WHISPER_MODEL)
+    decoder = ShortCommandDecoder(model, language="en")
 
     print("\nEnter=record, q=quit\n")
     while True:
@@ -37,7 +40,7 @@ def main():
         audio = record_audio(RECORD_SECONDS)
 
         print("[ASR] transcribing...")
-        result = model.transcribe(audio, language="en", fp16=False)
+        result = decoder.transcribe(audio)
         text = (result.get("text") or "").strip()
         print("[TEXT]", text if text else "(empty)")
         print()
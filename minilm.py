@@ -1,25 +1,269 @@
-import torch
-from sentence_transformers import SentenceTransformer, util
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from src.embedding_cache import EmbeddingCache, embedding_cache_path
+from src.intent_bank import (
+    artifact_path, load_compiled_bank, parse_intent_bank, read_bank_file, read_intent_bank, save_compiled_bank,
+)
+from src.intent_index import IntentIndex
+from src.lru_cache import LRUCache
+from src.model_registry import REGISTRY
+from src.text_utils import canonical_phrase, normalize_text
 
 MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 
+# "torch": sentence-transformers (PyTorch)
+# "onnx":  ONNX Runtime int8 (python -m src.onnx_encoder export 로 미리 변환 필요)
+ENCODER_BACKENDS = ("torch", "onnx")
+
+BANK_POLL_SEC = 1.0  # 뱅크 파일 변경 확인 주기
+QUERY_CACHE_SIZE = 512  # 최근 발화 임베딩 캐시 (같은 명령을 반복하면 인코딩 생략)
+WARMUP_PHRASES = ["start", "stop please", "move up five centimeters"]
+
+# 뱅크 한 벌 (통째로 교체해서 검색 중인 스레드가 섞인 상태를 보지 않게 함)
+_BankState = namedtuple("_BankState", ["intent_bank", "texts", "emb", "index", "version"])
+
+
+def encoder_fingerprint(backend: str = "torch") -> str:
+    """임베딩을 만든 모델 식별자 (int8 임베딩은 torch 임베딩과 조금 다르므로 구분)"""
+    return MODEL_NAME if backend == "torch" else f"{MODEL_NAME}:{backend}"
+
+
+def _create_encoder(backend: str):
+    if backend == "torch":
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        return SentenceTransformer(MODEL_NAME, device=device)
+    from src.onnx_encoder import OnnxMiniLMEncoder
+
+    return OnnxMiniLMEncoder()
+
+
+def load_encoder(backend: str = "torch"):
+    """encode(texts, normalize_embeddings=True)를 가진 인코더 (REGISTRY에서 공유)"""
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"알 수 없는 인코더 백엔드: {backend} (가능: {', '.join(ENCODER_BACKENDS)})")
+    return REGISTRY.acquire(("minilm", backend), lambda: _create_encoder(backend))
+
+
 class MiniLMRetriever:
-    def __init__(self, intent_bank):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model = SentenceTransformer(MODEL_NAME, device=self.device)
-        self.intent_bank = intent_bank
-        self.texts = [x["text"] for x in intent_bank]
-        self.bank_emb = self.model.encode(self.texts, normalize_embeddings=True)
+    def __init__(self, intent_bank, cache_path=None, backend="torch", pooling="max", embeddings=None,
+                 ann=None):
+        """
+        :param cache_path: 임베딩 캐시 경로 (embedding_cache_path(뱅크 경로)), None이면 매번 인코딩
+        :param backend: "torch" / "onnx" (int8, torch 없이 동작)
+        :param pooling: 인텐트 점수 계산 방식 "max" / "mean" / "centroid"
+        :param embeddings: 이미 계산된 뱅크 임베딩 (컴파일된 뱅크에서 읽은 경우)
+        :param ann: IVF 근사 탐색 사용 여부, None이면 뱅크가 클 때만 (src.ann_index.ANN_MIN_SIZE)
+        """
+        if not intent_bank:
+            raise ValueError("인텐트 뱅크가 비어 있습니다")  # 인코더를 올리기 전에 바로 실패
+        self.backend = backend
+        self.pooling = pooling
+        self.ann = ann
+        self.model = load_encoder(backend)
+        self.fingerprint = encoder_fingerprint(backend)
+        self.cache = EmbeddingCache(cache_path, self.fingerprint) if cache_path else None
+        self.bank_path = None  # from_bank_file()로 만들면 설정 (뱅크 교체 시 컴파일 파일도 갱신)
+
+        # 정규화한 발화 -> 임베딩 (인코더가 같으면 뱅크가 바뀌어도 유효)
+        self.query_cache = LRUCache(QUERY_CACHE_SIZE)
+        self._update_lock = threading.Lock()
+        self._watch_stop = None
+        if embeddings is None:
+            embeddings = self._encode_bank([x["text"] for x in intent_bank])
+        self._state = self._build_state(intent_bank, embeddings, version=0)
+
+    @classmethod
+    def from_bank_file(cls, bank_path: str, backend="torch", pooling="max", ann=None):
+        """
+        뱅크 JSON 경로로 생성
+        - 컴파일된 뱅크(.bank.npz)가 최신이면 JSON 파싱/인코딩 없이 바로 사용
+        - 아니면 JSON을 읽고(바뀐 문장만 인코딩) 컴파일 파일을 다시 저장
+        """
+        fingerprint = encoder_fingerprint(backend)
+        raw, sha1 = read_bank_file(bank_path)  # 해시와 파싱 모두 이 바이트 기준
+        compiled = load_compiled_bank(artifact_path(bank_path), fingerprint, sha1)
+        if compiled is not None:
+            bank, emb = compiled
+            retriever = cls(bank, cache_path=embedding_cache_path(bank_path),
+                            backend=backend, pooling=pooling, embeddings=emb, ann=ann)
+        else:
+            retriever = cls(parse_intent_bank(raw, bank_path), cache_path=embedding_cache_path(bank_path),
+                            backend=backend, pooling=pooling, ann=ann)
+            save_compiled_bank(artifact_path(bank_path), retriever.intent_bank, retriever.bank_emb,
+                               fingerprint, sha1)
+        retriever.bank_path = bank_path
+        return retriever
+
+    # 현재 뱅크 (읽기 전용)
+    @property
+    def intent_bank(self):
+        return self._state.intent_bank
+
+    @property
+    def texts(self):
+        return self._state.texts
+
+    @property
+    def bank_emb(self):
+        return self._state.emb
+
+    @property
+    def index(self):
+        return self._state.index
+
+    @property
+    def version(self):
+        """뱅크가 바뀔 때마다 증가 (라우터가 1단계 인덱스를 다시 만드는 기준)"""
+        return self._state.version
+
+    def snapshot(self):
+        """현재 뱅크 한 벌 (intent_bank/texts/emb/index/version이 항상 같은 버전)"""
+        return self._state
+
+    def _build_state(self, intent_bank, emb, version):
+        texts = [x["text"] for x in intent_bank]
+        index = IntentIndex(emb, [x["intent"] for x in intent_bank], texts, self.pooling, ann=self.ann)
+        return _BankState(intent_bank, texts, emb, index, version)
+
+    def _encode(self, texts):
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+
+    def _encode_bank(self, texts):
+        if self.cache is None:
+            return self._encode(texts)
+        return self.cache.get_or_encode(texts, self._encode)
+
+    def encode_queries(self, queries):
+        """
+        발화 임베딩 (B, dim), 캐시에 없는 발화만 한 번에 인코딩
+        - 캐시 키는 normalize_text() 기준이라 "Stop." / "stop" 은 같은 임베딩을 씀
+        """
+        keys = [normalize_text(q) for q in queries]
+        embs = [self.query_cache.get(key) for key in keys]
+        missing = {}
+        for q, key, e in zip(queries, keys, embs):
+            if e is None:
+                missing.setdefault(key, q)
+        if missing:
+            new = self._encode(list(missing.values()))
+            for key, e in zip(missing, new):
+                self.query_cache.put(key, e)
+            new = dict(zip(missing, new))
+            embs = [e if e is not None else new[key] for key, e in zip(keys, embs)]
+        return np.stack(embs).astype(np.float32)
 
     def retrieve_topk(self, query: str, k: int = 3):
-        q_emb = self.model.encode(query, normalize_embeddings=True)
-        scores = util.cos_sim(q_emb, self.bank_emb)[0]
-        topk = torch.topk(scores, k=min(k, len(self.intent_bank)))
-        results = []
-        for idx in topk.indices.tolist():
-            results.append({
-                "intent": self.intent_bank[idx]["intent"],
-                "text": self.intent_bank[idx]["text"],
-                "score": float(scores[idx]),
-            })
-        return results
+        """인텐트별 상위 k개 (같은 인텐트의 비슷한 예문이 후보를 독차지하지 않음)"""
+        q_emb = self.encode_queries([query])[0]
+        return self.index.topk(q_emb, k)
+
+    def retrieve_topk_batch(self, queries, k: int = 3):
+        """여러 발화를 한 번에 인코딩 + 행렬곱 한 번으로 채점"""
+        if not queries:
+            return []
+        q_embs = self.encode_queries(list(queries))
+        return self.index.topk_batch(q_embs, k)
+
+    def cache_info(self) -> dict:
+        return self.query_cache.info()
+
+    def warmup(self):
+        """한 개 / 배치 인코딩 + 채점 한 번씩 (query_cache를 거치지 않아 적중률 통계에 안 섞임)"""
+        self.index.topk(self._encode(WARMUP_PHRASES[0]), 3)
+        self.index.topk_batch(self._encode(WARMUP_PHRASES), 3)
+
+    # ======================
+    # 뱅크 실시간 교체
+    # ======================
+    def update_bank(self, intent_bank, source_sha1=None):
+        """
+        새 뱅크로 교체 (추가/삭제/수정된 문장만 인코딩)
+        - 인덱스를 새로 만든 뒤 한 번에 바꿔 끼우므로 검색은 멈추지 않음
+        :param source_sha1: intent_bank를 파싱한 bank_path 내용의 sha1, 있으면 컴파일 파일도 갱신
+            (교체 후 파일을 다시 해시하면 그 사이 바뀐 내용과 짝지어질 수 있으므로 받은 값만 사용)
+        """
+        if not intent_bank:
+            # watch()에서는 예외를 잡아 기존 뱅크를 그대로 씀 (저장 도중 빈 파일을 읽은 경우 등)
+            raise ValueError("인텐트 뱅크가 비어 있습니다")
+        with self._update_lock:
+            old = self._state
+            texts = [x["text"] for x in intent_bank]
+
+            if self.cache is not None:
+                # 디스크 캐시는 직전 뱅크 기준이므로 바뀐 문장만 인코딩됨
+                emb = self.cache.get_or_encode(texts, self._encode)
+            else:
+                known = {canonical_phrase(t): i for i, t in enumerate(old.texts)}
+                missing = [t for t in dict.fromkeys(texts) if canonical_phrase(t) not in known]
+                new_emb = dict(zip(missing, self._encode(missing))) if missing else {}
+                emb = np.stack([
+                    old.emb[known[canonical_phrase(t)]] if canonical_phrase(t) in known else new_emb[t]
+                    for t in texts
+                ]).astype(np.float32)
+
+            self._state = self._build_state(intent_bank, emb, version=old.version + 1)
+            if self.bank_path and source_sha1:
+                save_compiled_bank(artifact_path(self.bank_path), intent_bank, emb,
+                                   self.fingerprint, source_sha1)
+
+            old_set, new_set = set(old.texts), set(texts)
+            print(f"[Bank] reloaded: {len(texts)} phrases "
+                  f"(+{len(new_set - old_set)} / -{len(old_set - new_set)})")
+
+    def watch(self, path: str, loader=read_intent_bank, interval: float = BANK_POLL_SEC):
+        """
+        뱅크 파일을 주기적으로 확인해서 바뀌면 update_bank()
+        :param loader: 경로 -> ([{"intent","text"}, ...], 읽은 내용의 sha1)
+        """
+        # 컴파일 파일은 bank_path 것이므로 같은 파일을 볼 때만 해시를 넘김
+        same_file = self.bank_path is not None and os.path.abspath(path) == os.path.abspath(self.bank_path)
+        self.stop_watching()
+        stop = threading.Event()
+        self._watch_stop = stop
+
+        def _stat():
+            try:
+                st = os.stat(path)
+                return st.st_mtime_ns, st.st_size
+            except OSError:
+                return None
+
+        def _loop():
+            last = _stat()
+            while not stop.wait(interval):
+                cur = _stat()
+                if cur is None or cur == last:
+                    continue
+                try:
+                    bank, sha1 = loader(path)
+                except Exception as e:
+                    # 저장 도중에 읽었을 수 있으므로 다음 주기에 다시 시도
+                    print(f"[Bank] 뱅크를 읽을 수 없습니다 (기존 뱅크 유지): {e}")
+                    continue
+                last = cur
+                try:
+                    self.update_bank(bank, source_sha1=sha1 if same_file else None)
+                except Exception as e:
+                    print(f"[Bank] 뱅크 교체 실패 (기존 뱅크 유지): {e}")
+
+        threading.Thread(target=_loop, name="bank-watch", daemon=True).start()
+        print(f"[Bank] watching {path}")
+
+    def stop_watching(self):
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+            self._watch_stop = None
+
+    def close(self):
+        """감시 중지 + 공유 인코더 참조 반환"""
+        self.stop_watching()
+        if self.model is not None:
+            REGISTRY.release(("minilm", self.backend))
+            self.model = None
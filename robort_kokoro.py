@@ -1,62 +1,28 @@
 import time
-import threading
 import math
-import numpy as np
-import sounddevice as sd
 import os
 import sys
 
 from rtde_control import RTDEControlInterface
 from rtde_receive import RTDEReceiveInterface
 
-from kokoro_onnx import Kokoro
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from src.briefing import BriefingSystem
 
 
 ROBOT_IP = "192.168.0.61"  # 본인의 URSim/로봇 IP로 변경 필수
 ROBOT_SPEED = 0.01
 ROBOT_ACCEL = 0.1
 
+# 속도/거리만 바뀌는 안내는 조각을 미리 합성해 두고 이어 붙여 재생 (src/tts_segments.py)
+BRIEFING_TEMPLATES = [
+    "Initiating descent sequence. Target speed is {} meters per second.",
+    "Target position reached. Robot moved total {} meters.",
+]
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-KOKORO_MODEL_PATH = os.path.join(BASE_DIR, "data", "kokoro-v1.0.onnx")
-KOKORO_VOICES_PATH = os.path.join(BASE_DIR, "data", "voices-v1.0.bin")
-
-
-class BriefingSystem:
-    def __init__(self):
-        print("[TTS] Loading Kokoro...")
-        try:
-            self.tts = Kokoro(KOKORO_MODEL_PATH, KOKORO_VOICES_PATH)
-            self.is_speaking = False
-        except Exception as e:
-            print(f"[TTS Error] {e}")
-            print("모델 파일 경로를 확인해주세요.")
-            self.tts = None
-
-    def _speak_thread(self, text):
-        """실제 오디오 생성 및 재생을 담당하는 내부 함수"""
-        if not self.tts: return
-
-        self.is_speaking = True
-        try:
-            samples, sr = self.tts.create(text, voice="af_sarah", speed=1, lang="en-us")
-            sd.play(samples, samplerate=sr)
-            sd.wait()
-        except Exception as e:
-            print(f"[TTS Error] {e}")
-        finally:
-            self.is_speaking = False
-
-    def announce(self, text):
-        if self.is_speaking:
-            return
-
-        print(f"[Briefing] {text}")
-        self.t = threading.Thread(target=self._speak_thread, args=(text,))
-        self.t.start()
 
 def main():
-    briefing = BriefingSystem()
+    briefing = BriefingSystem(templates=BRIEFING_TEMPLATES)
 
     print(f"[ROBOT] Connecting to {ROBOT_IP}...")
     try:
@@ -126,8 +92,7 @@ def main():
         msg= f"Target position reached. Robot moved total {actual_distance:.2f} meters."
         briefing.announce(msg)
 
-        if briefing.t is not None and briefing.t.is_alive():
-            briefing.t.join()
+        briefing.wait_until_finished()
 
     except KeyboardInterrupt:
         print("\n[ROBOT] Interrupted by User!")
@@ -12,9 +12,13 @@ torchaudio.utils._handle_backend = lambda *args, **kwargs: None
 # except:
 #     pass
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
-from src.briefing import BriefingSystem
+from src.briefing import BriefingSystem, PRIORITY_PROGRESS, PRIORITY_SAFETY
 from src.voice_stop import VoiceEmergencySystem
 from src.voice_check import SpeakerAuth
+from src.asr_engine import DEFAULT_ASR_BACKEND, load_asr_engine
+from src.robot_safety import RTDE_LOCK
+from src.startup import Startup, preimport
+from src.warmup import warm_up
 
 from rtde_control import RTDEControlInterface
 from rtde_receive import RTDEReceiveInterface
@@ -26,6 +30,12 @@ BRIEFING_INTERVAL = 5.0
 LOG_FILENAME = f"event_log_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
 MASTER_VOICE_FILE = "master.wav"
 
+# 숫자만 바뀌는 브리핑은 조각을 미리 합성해 두고 이어 붙여 재생 (제어 루프 중 Kokoro 추론 없음)
+BRIEFING_TEMPLATES = [
+    "Total moved {} meters.",
+    "All tasks finished. Total distance moved is {} meters.",
+]
+
 def get_distance(p1, p2):
     return math.sqrt((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2 + (p1[2] - p2[2]) ** 2)
 
@@ -44,20 +54,35 @@ def log_time(tag):
 
 def main():
     init_log_file()
-    briefing = BriefingSystem()
-
-    auth_system = SpeakerAuth(master_file=MASTER_VOICE_FILE)
 
+    # Kokoro / ECAPA / 비상정지용 Whisper 로드와 로봇 연결을 동시에 진행
+    # (미리 올린 Whisper 엔진을 VoiceEmergencySystem에 그대로 넘김 -> 두 번 로드하지 않음)
     print(f"[ROBOT] Connecting to {ROBOT_IP}...")
+    log_time("시스템 시작")
+    # whisper는 메인 스레드에서 먼저 import (torch/speechbrain은 위에서 이미 import됨)
+    preimport("whisper" if DEFAULT_ASR_BACKEND == "whisper" else "faster_whisper")
+    startup = Startup()
+    startup.add("kokoro", BriefingSystem, templates=BRIEFING_TEMPLATES)
+    startup.add("ecapa", SpeakerAuth, master_file=MASTER_VOICE_FILE)
+    startup.add("whisper", load_asr_engine, "tiny", backend=DEFAULT_ASR_BACKEND, language=None)
+    startup.add("rtde_c", RTDEControlInterface, ROBOT_IP)
+    startup.add("rtde_r", RTDEReceiveInterface, ROBOT_IP)
     try:
-        log_time("시스템 시작")
-        rtde_c = RTDEControlInterface(ROBOT_IP)
-        rtde_r = RTDEReceiveInterface(ROBOT_IP)
+        parts = startup.wait()
         print("[ROBOT] Connection Successful!")
     except Exception as e:
-        print(f"[ROBOT ERROR] 연결 실패: {e}")
+        print(f"[ROBOT ERROR] 시작 실패: {e}")
         sys.exit(1)
 
+    briefing, auth_system = parts["kokoro"], parts["ecapa"]
+    rtde_c, rtde_r = parts["rtde_c"], parts["rtde_r"]
+
+    # 첫 안내 / 첫 인증 / 첫 비상정지 인식이 느리지 않도록 미리 한 번씩 추론
+    warm_up(
+        {"kokoro": briefing.warmup, "ecapa": auth_system.warmup, "whisper": parts["whisper"].warmup},
+        log=lambda name, cold, warm: log_time(f"warm-up {name}: cold {cold:.3f}s / warm {warm:.3f}s"),
+    )
+
     while True:
         briefing.announce("Please say your name.")
         briefing.wait_until_finished()
@@ -69,13 +94,14 @@ def main():
         if is_same_person:
             briefing.announce("approved.")
             briefing.wait_until_finished()
+            auth_system.close()  # 인증 후에는 ECAPA를 내려서 메모리 확보
             break
         else:
             briefing.announce("failed. Please try again.")
             briefing.wait_until_finished()
             time.sleep(1)
 
-    voice_system = VoiceEmergencySystem(rtde_c, log_callback=log_time)
+    voice_system = VoiceEmergencySystem(rtde_c, log_callback=log_time, asr_engine=parts["whisper"])
     voice_system.start()
 
     time.sleep(1.0)
@@ -146,11 +172,16 @@ def main():
                 break
 
             target_pose[1] += 0.001
-            rtde_c.moveL(target_pose, ROBOT_SPEED, ROBOT_ACCEL, True)
+            # 비상정지 스레드의 정지 명령과 겹치지 않게, 정지된 뒤에는 이동하지 않음
+            with RTDE_LOCK:
+                if voice_system.is_triggered():
+                    break
+                rtde_c.moveL(target_pose, ROBOT_SPEED, ROBOT_ACCEL, True)
 
             while True:
                 if voice_system.is_triggered():
-                    rtde_c.stopL(1.0)
+                    with RTDE_LOCK:
+                        rtde_c.stopL(1.0)
                     break
                 curr_pose = rtde_r.getActualTCPPose()
 
@@ -159,11 +190,12 @@ def main():
                 last_pose = curr_pose
 
                 current_time = time.time()
-                if (current_time - last_briefing_time >= BRIEFING_INTERVAL) and (not briefing.is_speaking):
+                if current_time - last_briefing_time >= BRIEFING_INTERVAL:
                     elapsed = int(current_time - start_time)
                     msg = f"Total moved {total_moved_distance:.2f} meters."
                     log_time("중간 tts 브리핑")
-                    briefing.announce(msg)
+                    # 아직 말하는 중이면 대기 중인 진행 브리핑을 최신 값으로 교체
+                    briefing.announce(msg, priority=PRIORITY_PROGRESS, coalesce="progress")
                     last_briefing_time = current_time
 
                 remaining_dist = get_distance(curr_pose, target_pose)
@@ -176,8 +208,8 @@ def main():
                 break
 
         if voice_system.is_triggered():
-            briefing.wait_until_finished()
-            briefing.announce("Emergency stop.")
+            # 진행 브리핑 중이면 끊고 바로 안내
+            briefing.announce("Emergency stop.", priority=PRIORITY_SAFETY)
             log_time("비상 정지 tts 실행")
         else:
             final_msg = f"All tasks finished. Total distance moved is {total_moved_distance:.2f} meters."
@@ -193,6 +225,8 @@ def main():
         print(f"[ROBOT ERROR] {e}")
         rtde_c.stopL()
     finally:
+        voice_system.stop()  # 감시 종료 + Whisper 참조 반환
+        briefing.close()
         rtde_c.stopScript()
         rtde_c.disconnect()
         rtde_r.disconnect()
@@ -1,13 +1,93 @@
+from src.lexical import LexicalMatcher
+from src.lru_cache import LRUCache
+from src.text_utils import normalize_text
+
+ROUTE_CACHE_SIZE = 256  # 최근 라우팅 결과 캐시 (뱅크가 바뀌면 비움)
+
+
 class IntentRouter:
-    def __init__(self, retriever, threshold: float = 0.55):
+    def __init__(self, retriever, threshold: float = 0.55, lexical: bool = True):
+        """
+        :param lexical: True면 뱅크 문장과 거의 같은 발화는 MiniLM 없이 1단계(LexicalMatcher)에서 결정
+        """
         self.retriever = retriever
         self.threshold = threshold
+        self.use_lexical = lexical
+        self.lexical = None
+        self._bank_version = None
+        # (뱅크 version, threshold, 정규화한 발화) -> (chosen, candidates)
+        self.cache = LRUCache(ROUTE_CACHE_SIZE)
+        self._sync_bank()
+
+    def _sync_bank(self):
+        """뱅크가 바뀌었으면(version) 1단계 인덱스를 다시 만들고 결과 캐시를 비움"""
+        snapshot = self.retriever.snapshot()  # 한 번만 읽어서 version/문장/인텐트가 같은 뱅크에서 나오게 함
+        if snapshot.version == self._bank_version:
+            return
+        if self.use_lexical:
+            self.lexical = LexicalMatcher.from_snapshot(snapshot)
+        self.cache.clear()
+        self._bank_version = snapshot.version
+
+    def _cache_key(self, utterance: str):
+        return self._bank_version, self.threshold, normalize_text(utterance)
 
     def route(self, utterance: str):
-        candidates = self.retriever.retrieve_topk(utterance, k=3)
+        self._sync_bank()
+        key = self._cache_key(utterance)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # 1단계: 정규화 완전 일치 / 3-gram 유사도 (확신할 때만)
+        result = self.lexical.match(utterance) if self.lexical is not None else None
+
+        # 2단계: MiniLM
+        if result is None:
+            candidates = self.retriever.retrieve_topk(utterance, k=3)
+            result = (self._choose(candidates), candidates)
+        self.cache.put(key, result)
+        return result
+
+    def route_many(self, utterances):
+        """
+        여러 발화를 한 번에 라우팅 (로그 재생/평가용)
+        - 1단계에서 결정되지 않은 발화만 모아서 MiniLM 배치 인코딩
+        """
+        self._sync_bank()
+        results = [None] * len(utterances)
+        pending = []
+        for i, utt in enumerate(utterances):
+            hit = self.cache.get(self._cache_key(utt))
+            if hit is None and self.lexical is not None:
+                hit = self.lexical.match(utt)
+                if hit is not None:
+                    self.cache.put(self._cache_key(utt), hit)
+            if hit is not None:
+                results[i] = hit
+            else:
+                pending.append(i)
+
+        batch = self.retriever.retrieve_topk_batch([utterances[i] for i in pending], k=3)
+        for i, candidates in zip(pending, batch):
+            results[i] = (self._choose(candidates), candidates)
+            self.cache.put(self._cache_key(utterances[i]), results[i])
+        return results
+
+    def cache_info(self) -> dict:
+        """라우팅 결과 캐시 / 발화 임베딩 캐시 적중률"""
+        info = {"route": self.cache.info()}
+        if hasattr(self.retriever, "cache_info"):
+            info["query"] = self.retriever.cache_info()
+        return info
+
+    def _choose(self, candidates):
         best = candidates[0]
+        # 1등과 2등 인텐트의 점수 차 (작을수록 애매한 발화)
+        margin = best["score"] - candidates[1]["score"] if len(candidates) > 1 else best["score"]
         if best["score"] >= self.threshold:
-            chosen = best
+            chosen = dict(best, margin=margin, source="minilm")
         else:
-            chosen = {"intent": "UNKNOWN", "score": best["score"], "text": ""}
-        return chosen, candidates
+            chosen = {"intent": "UNKNOWN", "score": best["score"], "text": "", "margin": margin,
+                      "source": "minilm"}
+        return chosen
@@ -1,27 +1,29 @@
 from src.tts_kokoro import KokoroTTS
 from src.response_generator import ResponseGenerator, DialogState
-from src.audio_out import play
+from src.audio_out import play_stream
 from src.logger import JsonlLogger
+from src.keywords import KeywordMatcher, PAIN_KEYWORDS
+
+# pain > discomfort > anxiety (pain uses the shared safety list)
+# whole-word matching: inflections are listed explicitly ("tighter" does not match "tight")
+FAKE_ROUTER_MATCHER = KeywordMatcher({
+    "pain": PAIN_KEYWORDS + ["hurtful", "aching", "ache", "aches", "ached", "sore", "soreness", "too much"],
+    "discomfort": ["uncomfortable", "uncomfortably", "discomfort", "pressure", "pressures", "too tight", "too hard",
+                   "tight", "tighter", "tightly", "tightness", "tightening",
+                   "push", "pushes", "pushed", "pushing", "pushy"],
+    "anxiety": ["nervous", "nervously", "nervousness", "anxious", "anxiously", "scared", "worried", "afraid",
+                "panic", "panics", "panicked", "panicking", "panicky"],
+})
+FAKE_ROUTER_SCORES = {"pain": 0.90, "discomfort": 0.80, "anxiety": 0.80}
 
 
 def fake_router(text: str):
     """
     Temporary router for English input.
     """
-    t = text.strip().lower()
-
-    # pain
-    if any(k in t for k in ["pain", "hurt", "hurts", "aching", "ache", "sore", "too much", "it hurts"]):
-        return "pain", 0.90
-
-    # discomfort
-    if any(k in t for k in ["uncomfortable", "discomfort", "pressure", "too tight", "too hard", "tight", "push"]):
-        return "discomfort", 0.80
-
-    # anxiety
-    if any(k in t for k in ["nervous", "anxious", "scared", "worried", "afraid", "panic"]):
-        return "anxiety", 0.80
-
+    hit = FAKE_ROUTER_MATCHER.first(text.strip())
+    if hit:
+        return hit.category, FAKE_ROUTER_SCORES[hit.category]
     return "other", 0.50
 
 
@@ -45,8 +47,8 @@ def main():
         intent, score = fake_router(user_text)
         response_text, state = rg.generate(user_text, intent, state)
 
-        audio, sr = tts.synthesize(response_text)
-        play(audio, sr)
+        # play while later sentences are still being synthesized
+        first_audio = play_stream(tts.synthesize_stream(response_text), tts.sr)
 
         logger.log_turn(
             user_text=user_text,
@@ -57,6 +59,8 @@ def main():
         )
 
         print(f"BOT> {response_text}  (intent={intent}, score={score:.2f})")
+        if first_audio is not None:
+            print(f"     (first audio after {first_audio:.2f}s)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+import time
+
+import numpy as np
+
+ANN_MIN_SIZE = 5000  # 예문이 이보다 적으면 전수 비교가 더 빠름
+ANN_N_PROBE = 8  # 쿼리마다 살펴볼 군집 수
+ANN_CANDIDATES = 64  # ANN으로 뽑은 뒤 인텐트별 max pooling에 쓰는 예문 수
+
+
+class IVFIndex:
+    """
+    IVF(inverted file) 근사 최근접 탐색 (외부 서비스/라이브러리 없이 NumPy만 사용)
+    - 정규화된 임베딩을 spherical k-means로 n_lists개 군집으로 나눔
+    - 쿼리는 중심이 가까운 n_probe개 군집 안의 예문만 정확히 비교
+    - search()가 돌려주는 행 번호는 입력 임베딩 기준
+    """
+
+    def __init__(self, emb: np.ndarray, n_lists: int = None, n_probe: int = ANN_N_PROBE,
+                 n_iter: int = 10, seed: int = 0):
+        emb = np.asarray(emb, dtype=np.float32)
+        n = len(emb)
+        self.n_lists = min(n_lists or max(int(np.sqrt(n)), 1), n)
+        self.n_probe = min(n_probe, self.n_lists)
+
+        centroids, assign = self._kmeans(emb, self.n_lists, n_iter, seed)
+        order = np.argsort(assign, kind="stable")
+        self.centroids = centroids
+        self.rows = order  # 정렬된 위치 -> 원래 행 번호
+        self.emb = np.ascontiguousarray(emb[order])
+        counts = np.bincount(assign, minlength=self.n_lists)
+        self.starts = np.r_[0, np.cumsum(counts)[:-1]]
+        self.counts = counts
+
+    @staticmethod
+    def _assign(emb, centroids, block: int = 8192):
+        out = np.empty(len(emb), dtype=np.int64)
+        for i in range(0, len(emb), block):
+            out[i:i + block] = np.argmax(emb[i:i + block] @ centroids.T, axis=1)
+        return out
+
+    def _kmeans(self, emb, k, n_iter, seed):
+        rng = np.random.default_rng(seed)
+        centroids = emb[rng.choice(len(emb), size=k, replace=False)].copy()
+        assign = self._assign(emb, centroids)
+        for _ in range(n_iter):
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, emb)
+            empty = np.bincount(assign, minlength=k) == 0
+            if empty.any():  # 빈 군집은 임의의 예문으로 다시 시작
+                sums[empty] = emb[rng.choice(len(emb), size=int(empty.sum()), replace=False)]
+            centroids = sums / np.clip(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12, None)
+            new_assign = self._assign(emb, centroids)
+            if np.array_equal(new_assign, assign):
+                break
+            assign = new_assign
+        return centroids.astype(np.float32), assign
+
+    def __len__(self):
+        return len(self.rows)
+
+    def search(self, q_emb: np.ndarray, k: int = 10):
+        """-> (원래 행 번호, 점수) 점수 내림차순"""
+        cs = self.centroids @ q_emb
+        cs[self.counts == 0] = -np.inf  # 빈 군집은 마지막에 (k-means가 끝날 때 비어 있을 수 있음)
+        probe = np.argpartition(-cs, self.n_probe - 1)[:self.n_probe]
+        cand = np.concatenate([np.arange(self.starts[c], self.starts[c] + self.counts[c]) for c in probe])
+        if len(cand) == 0:
+            # 살펴본 군집이 모두 비어 있으면 전수 비교
+            cand = np.arange(len(self.emb))
+        scores = self.emb[cand] @ q_emb
+        k = min(k, len(cand))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return self.rows[cand[top]], scores[top]
+
+
+def exact_search(emb: np.ndarray, q_emb: np.ndarray, k: int = 10):
+    scores = emb @ q_emb
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top, scores[top]
+
+
+def benchmark(emb: np.ndarray, queries: np.ndarray, k: int = 10, n_probe: int = ANN_N_PROBE):
+    """전수 비교 대비 IVF의 recall@k와 쿼리당 지연시간"""
+    t0 = time.perf_counter()
+    ivf = IVFIndex(emb, n_probe=n_probe)
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    exact = [set(exact_search(emb, q, k)[0].tolist()) for q in queries]
+    exact_ms = (time.perf_counter() - t0) / len(queries) * 1000
+
+    t0 = time.perf_counter()
+    approx = [set(ivf.search(q, k)[0].tolist()) for q in queries]
+    ann_ms = (time.perf_counter() - t0) / len(queries) * 1000
+
+    recall = float(np.mean([len(a & e) / len(e) for a, e in zip(approx, exact)]))
+    return {
+        "n": len(emb), "n_lists": ivf.n_lists, "n_probe": ivf.n_probe, "build_s": build,
+        "recall": recall, "exact_ms": exact_ms, "ann_ms": ann_ms,
+    }
@@ -0,0 +1,120 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from src.model_registry import REGISTRY
+
+# "whisper": openai-whisper (PyTorch, fp32)
+# "ct2":     faster-whisper (CTranslate2, CPU int8 양자화)
+ASR_BACKENDS = ("whisper", "ct2")
+DEFAULT_ASR_BACKEND = "whisper"
+
+# 명령어("stop", "move up")는 몇 토큰이면 충분하므로 디코딩 길이 상한을 낮게 잡음
+COMMAND_SAMPLE_LEN = 24
+
+WARMUP_SEC = 1.0  # warm-up용 더미 입력 길이 (짧은 명령어 한 개 정도)
+
+
+class ASREngine(ABC):
+    """
+    ASR 엔진 공통 인터페이스
+    - transcribe(audio): float32 16kHz mono 배열(또는 파일 경로) -> {"text": ..., ...}
+    - 반환 형식은 whisper의 model.transcribe()와 같은 dict
+    - 모델은 REGISTRY에서 받아 같은 모델을 쓰는 엔진끼리 공유 (언어가 달라도 같은 가중치)
+    """
+
+    backend = None
+
+    def __init__(self, model_name: str, language="en"):
+        self.model_name = model_name
+        self.language = language
+        self.registry_key = None
+        self.model = None
+
+    @abstractmethod
+    def transcribe(self, audio) -> dict:
+        ...
+
+    def warmup(self):
+        """작은 잡음으로 한 번 추론 (첫 명령의 초기화 지연 제거)"""
+        rng = np.random.default_rng(0)
+        self.transcribe((rng.standard_normal(int(16000 * WARMUP_SEC)) * 0.01).astype(np.float32))
+
+    def close(self):
+        """공유 모델 참조 반환 (마지막 사용자면 메모리에서 내려감, 이 엔진도 모델을 놓아야 실제로 해제)"""
+        if self.registry_key is not None:
+            REGISTRY.release(self.registry_key)
+            self.registry_key = None
+        self.model = None
+
+
+class WhisperEngine(ASREngine):
+    """
+    openai-whisper 백엔드 (짧은 명령어는 ShortCommandDecoder 경로 사용)
+    - 디코딩 중 모델에 kv-cache hook을 달기 때문에 같은 모델을 쓰는 엔진끼리 transcribe를 직렬화
+    """
+
+    backend = "whisper"
+
+    def __init__(self, model_name: str, language="en", device=None):
+        super().__init__(model_name, language)
+        import whisper
+        from src.whisper_fast import ShortCommandDecoder
+
+        key = ("whisper", model_name, device)
+        self.model = REGISTRY.acquire(key, lambda: whisper.load_model(model_name, device=device))
+        self.registry_key = key
+        self._lock = REGISTRY.use_lock(key)
+        self.decoder = ShortCommandDecoder(self.model, language=language)
+
+    def transcribe(self, audio) -> dict:
+        with self._lock:
+            return self.decoder.transcribe(audio)
+
+    def close(self):
+        super().close()
+        self.decoder = None  # 디코더도 모델을 참조하고 있음
+
+
+class CT2WhisperEngine(ASREngine):
+    """
+    CTranslate2(faster-whisper) int8 백엔드
+    - 같은 모델 이름("tiny", "small", "base.en" ...)의 CT2 변환본을 사용
+    - CPU에서 int8 가중치로 돌기 때문에 PyTorch fp32 대비 메모리/속도 모두 유리
+    """
+
+    backend = "ct2"
+
+    def __init__(self, model_name: str, language="en", compute_type="int8", cpu_threads=0):
+        super().__init__(model_name, language)
+        from faster_whisper import WhisperModel
+
+        # CTranslate2 모델은 여러 스레드에서 동시에 호출해도 되므로 lock 없이 공유
+        key = ("ct2", model_name, compute_type)
+        self.model = REGISTRY.acquire(key, lambda: WhisperModel(
+            model_name, device="cpu",
+            compute_type=compute_type, cpu_threads=cpu_threads
+        ))
+        self.registry_key = key
+
+    def transcribe(self, audio) -> dict:
+        if not isinstance(audio, str):
+            audio = np.asarray(audio, dtype=np.float32)
+
+        segments, info = self.model.transcribe(
+            audio, language=self.language,
+            beam_size=1, best_of=1, temperature=0.0,
+            without_timestamps=True, condition_on_previous_text=False,
+            max_new_tokens=COMMAND_SAMPLE_LEN, vad_filter=False,
+        )
+        text = "".join(seg.text for seg in segments)  # generator라서 여기서 실제 디코딩
+        return {"text": text, "language": info.language}
+
+
+def load_asr_engine(model_name: str, backend: str = DEFAULT_ASR_BACKEND, language="en") -> ASREngine:
+    """설정값(backend)에 맞는 ASR 엔진 생성"""
+    if backend == "whisper":
+        return WhisperEngine(model_name, language=language)
+    if backend == "ct2":
+        return CT2WhisperEngine(model_name, language=language)
+    raise ValueError(f"알 수 없는 ASR 백엔드: {backend} (가능: {', '.join(ASR_BACKENDS)})")
@@ -1,14 +1,82 @@
+import heapq
+import itertools
 import os
 import threading
-import sounddevice as sd
+import time
+from collections import deque
+
 from kokoro_onnx import Kokoro
 
+from src.audio_out import get_audio_out
+from src.model_registry import REGISTRY
+from src.tts_cache import PhraseAudioCache
+from src.tts_segments import SegmentTTS
+
+VOICE = "af_sarah"
+SPEED = 1.0
+LANG = "en-us"
+
+# 시작할 때 미리 합성해 두는 고정 안내 문구 (combined.py / robort_kokoro_main.py)
+PRERENDER_PHRASES = [
+    "Stopping.", "Backing off.", "System armed.", "Speed decreased.", "Normal speed.",
+    "Ready to start.", "Unknown command.", "Shutting down.",
+    "Please say your name.", "approved.", "failed. Please try again.",
+    "Starting sequence.", "Emergency stop.",
+]
+
+
+# 우선순위 (작을수록 먼저)
+PRIORITY_SAFETY = 0  # 정지/통증 확인: 말하던 것을 끊고 바로, 대기 중인 덜 급한 안내는 버림
+PRIORITY_NORMAL = 1  # 명령 확인 등 일반 안내 (순서대로)
+PRIORITY_PROGRESS = 2  # 주기적 진행 브리핑 (coalesce 키가 같으면 가장 최근 것만)
+
+MAX_PENDING = 8  # 대기열이 이보다 길면 가장 덜 급하고 오래된 안내부터 버림
+HISTORY_SIZE = 100  # 최근 안내별 시간 기록 개수
+PREEMPT_POLL_SEC = 0.01  # 재생 중 안전 안내 확인 주기
+CLOSE_JOIN_SEC = 2.0  # close()에서 작업 스레드(합성 중일 수 있음) 종료 대기 시간
+
+
+class _Message:
+    def __init__(self, text, priority, coalesce, seq):
+        self.text = text
+        self.priority = priority
+        self.coalesce = coalesce
+        self.seq = seq
+        self.enqueued = time.perf_counter()
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
 
 class BriefingSystem:
-    def __init__(self):
+    """
+    안내 음성 스케줄러
+    - 작업 스레드 하나가 우선순위 큐에서 안내를 꺼내 합성/재생 (안내마다 스레드를 만들지 않음)
+    - 말하는 중에 온 안내도 버리지 않고 대기, 안전 안내는 말하던 것을 끊고 먼저 재생
+    - 안내마다 큐 대기 / 합성 / 재생 시간을 history에 기록
+    """
+
+    def __init__(self, phrases=None, templates=None):
+        """
+        :param phrases: PRERENDER_PHRASES 외에 미리 합성해 둘 문구 (예: "Moving up.")
+        :param templates: 숫자만 바뀌는 안내 (예: "Total moved {} meters."), 조각을 이어 붙여 재생
+        """
         self.tts = None
+        self.registry_key = None  # 공유 Kokoro 참조 (close()에서 반환)
+        self.cache = None
+        self.segments = None
         self.is_speaking = False
         self.thread = None
+        self.history = deque(maxlen=HISTORY_SIZE)
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._latest = {}  # coalesce 키 -> 대기 중인 최신 안내
+        self._current = None  # 지금 합성/재생 중인 안내
+        self._preempt = threading.Event()
+        self._cv = threading.Condition()
+        self._running = True
 
         # 2. 경로 설정 (src 폴더 기준 한 단계 위로 올라가기)
         try:
@@ -24,48 +92,187 @@ class BriefingSystem:
 
             print(f"[TTS] Loading Kokoro from: {os.path.join(project_root, 'data')}")
 
-            # 3. 모델 로드 시도
-            self.tts = Kokoro(model_path, voices_path)
+            # 3. 모델 로드 시도 (이미 다른 곳에서 올린 Kokoro가 있으면 공유)
+            key = ("kokoro", model_path, voices_path)
+            self.tts = REGISTRY.acquire(key, lambda: Kokoro(model_path, voices_path))
+            self.registry_key = key
             print("[TTS] Engine Ready.")
 
+            # 4. 고정 문구는 미리 합성 (디스크 캐시에 있으면 읽기만) -> 재생할 때 합성 없음
+            self.cache = PhraseAudioCache(
+                lambda text, voice, speed, lang: self.tts.create(text, voice=voice, speed=speed, lang=lang),
+                cache_dir=os.path.join(project_root, "data", "tts_cache"),
+                model_id=f"{os.path.basename(model_path)}:{os.path.basename(voices_path)}",
+            )
+            self.prerender(PRERENDER_PHRASES + list(phrases or []))
+            if templates:
+                self.add_templates(templates)
+
         except Exception as e:
             # 에러가 나도 변수는 이미 초기화되어 있으므로 프로그램은 죽지 않음
             print(f"[TTS Error] 모델 로드 실패: {e}")
             print("경로가 올바른지, data 폴더가 src 폴더 '밖에' 있는지 확인하세요.")
             self.tts = None
 
-    def _speak_thread(self, text):
-        """내부적으로 실행되는 말하기 스레드"""
-        if not self.tts: return
+        if self.tts is not None:
+            self.thread = threading.Thread(target=self._worker, name="briefing", daemon=True)
+            self.thread.start()
 
-        self.is_speaking = True
+    def prerender(self, phrases):
+        """문구를 미리 합성해서 캐시에 넣어 둠 (announce()에서 바로 재생)"""
+        if self.cache is None:
+            return
         try:
-            # 음성 생성 (속도, 목소리 변경 가능)
-            samples, sr = self.tts.create(text, voice="af_sarah", speed=1.0, lang="en-us")
-            sd.play(samples, samplerate=sr)
-            sd.wait()  # 다 말할 때까지 대기
+            made = self.cache.prerender(phrases, VOICE, SPEED, LANG)
+            print(f"[TTS] {len(phrases)} phrases ready ({made} newly rendered)")
         except Exception as e:
-            print(f"[TTS Play Error] {e}")
-        finally:
-            self.is_speaking = False
+            print(f"[TTS Error] 문구 미리 합성 실패 (재생 시 합성): {e}")
 
-    def announce(self, text):
-        """외부에서 호출하는 함수 (비동기 말하기)"""
-        # 이미 말하고 있으면 스킵 (중복 방지)
+    def add_templates(self, templates):
+        """템플릿 고정 조각 + 숫자 단어를 미리 합성 (한 번만, 이후 디스크 캐시)"""
+        if self.cache is None:
+            return
+        try:
+            if self.segments is None:
+                self.segments = SegmentTTS(self.cache, VOICE, SPEED, LANG)
+            for t in templates:
+                self.segments.add_template(t)
+            print(f"[TTS] {len(templates)} briefing templates ready")
+        except Exception as e:
+            print(f"[TTS Error] 템플릿 준비 실패 (재생 시 전체 합성): {e}")
+
+    def warmup(self):
+        """재생 없이 합성만 한 번 (첫 안내 음성의 초기화 지연 제거)"""
+        if self.tts:
+            self.tts.create("System ready.", voice=VOICE, speed=SPEED, lang=LANG)
+
+    def _synthesize(self, text):
+        """
+        캐시에 있으면 합성 없이 바로, 템플릿에 맞으면 조각을 이어 붙이고,
+        둘 다 아니면 Kokoro 합성 (자유 문장은 캐시에 넣지 않음)
+        """
+        hit = self.cache.get(text, VOICE, SPEED, LANG) if self.cache is not None else None
+        if hit is None and self.segments is not None:
+            hit = self.segments.render(text)
+        if hit is not None:
+            return hit
+        return self.tts.create(text, voice=VOICE, speed=SPEED, lang=LANG)
+
+    # ======================
+    # 작업 스레드
+    # ======================
+    def _pending(self):
+        return [m for m in self._heap if not m.cancelled]
+
+    def _worker(self):
+        while True:
+            with self._cv:
+                while self._running and not self._pending():
+                    self._cv.wait()
+                if not self._running:
+                    return
+                msg = heapq.heappop(self._heap)
+                while msg.cancelled:
+                    msg = heapq.heappop(self._heap)
+                if self._latest.get(msg.coalesce) is msg:
+                    del self._latest[msg.coalesce]
+                self._current = msg
+                self._preempt.clear()
+                self.is_speaking = True
+
+            try:
+                self._speak(msg)
+            except Exception as e:
+                print(f"[TTS Play Error] {e}")
+            finally:
+                with self._cv:
+                    self._current = None
+                    self.is_speaking = False
+                    self._cv.notify_all()
+
+    def _speak(self, msg):
+        t_start = time.perf_counter()
+        samples, sr = self._synthesize(msg.text)
+        t_synth = time.perf_counter()
+
+        # 합성하는 동안 더 급한 안내가 왔으면 재생하지 않음
+        preempted = self._preempt.is_set()
+        if not preempted:
+            out = get_audio_out()
+            pb = out.play(samples, sr)
+            while not pb.wait(PREEMPT_POLL_SEC):
+                if self._preempt.is_set():
+                    out.cancel(pb)  # 안전 안내가 와서 중간에 끊음 (다른 소리는 그대로)
+                    preempted = True
+                    break
+        t_end = time.perf_counter()
+
+        record = {
+            "text": msg.text, "priority": msg.priority,
+            "queue_wait": t_start - msg.enqueued, "synth": t_synth - t_start,
+            "play": t_end - t_synth, "preempted": preempted,
+        }
+        self.history.append(record)
+        print(f"[Briefing] '{msg.text}' wait {record['queue_wait']:.3f}s synth {record['synth']:.3f}s "
+              f"play {record['play']:.3f}s" + (" (preempted)" if preempted else ""))
+
+    # ======================
+    # 외부 호출
+    # ======================
+    def announce(self, text, priority=PRIORITY_NORMAL, coalesce=None):
+        """
+        안내 예약 (비동기, 바로 반환)
+        :param priority: PRIORITY_SAFETY / PRIORITY_NORMAL / PRIORITY_PROGRESS
+        :param coalesce: 같은 키로 대기 중인 안내가 있으면 새 안내로 교체 (예: "progress")
+        """
         if self.tts is None:
             print(f"[Briefing (No Audio)] {text}")
             return
-        if self.is_speaking:
-            return
 
         print(f"[Briefing] {text}")
+        with self._cv:
+            msg = _Message(text, priority, coalesce, next(self._seq))
+            if coalesce is not None:
+                old = self._latest.get(coalesce)
+                if old is not None:
+                    old.cancelled = True
+                self._latest[coalesce] = msg
+
+            if priority == PRIORITY_SAFETY:
+                # 정지 후에는 대기 중이던 이동/진행 안내가 의미 없으므로 버리고, 말하던 것도 끊음
+                for m in self._heap:
+                    if m.priority > priority:
+                        m.cancelled = True
+                if self._current is not None and self._current.priority > priority:
+                    self._preempt.set()
 
-        # 새로운 스레드 시작
-        self.thread = threading.Thread(target=self._speak_thread, args=(text,))
-        self.thread.start()
+            heapq.heappush(self._heap, msg)
+            pending = self._pending()
+            if len(pending) > MAX_PENDING:
+                min(pending, key=lambda m: (-m.priority, m.seq)).cancelled = True
+            self._cv.notify_all()
 
     def wait_until_finished(self):
-        """현재 하고 있는 말이 끝날 때까지 대기 (프로그램 종료 전 사용)"""
-        if self.thread is not None and self.thread.is_alive():
+        """대기 중인 안내까지 모두 끝날 때까지 대기 (프로그램 종료 전 사용)"""
+        with self._cv:
+            if self._current is None and not self._pending():
+                return
             print("[TTS] Waiting for speech to finish...")
-            self.thread.join()
\ No newline at end of file
+            while self._running and (self._current is not None or self._pending()):
+                self._cv.wait()
+
+    def close(self):
+        """
+        작업 스레드 종료 (말하던 것은 끊음) + 공유 Kokoro 참조 반환
+        - Kokoro의 onnxruntime 스레드 풀은 세션과 함께 있으므로 마지막 참조가 반환되면 같이 내려감
+        """
+        with self._cv:
+            self._running = False
+            self._preempt.set()
+            self._cv.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(CLOSE_JOIN_SEC)
+        if self.registry_key is not None:
+            REGISTRY.release(self.registry_key)
+            self.registry_key = None
+        self.tts = None  # 여기서도 놓아야 실제로 메모리에서 내려감 (이후 announce()는 출력만)
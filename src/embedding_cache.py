@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from src.text_utils import canonical_phrase
+
+
+def embedding_cache_path(bank_path: str) -> str:
+    """인텐트 뱅크 옆에 두는 캐시 경로 (data/intent_bank_JH.json -> data/intent_bank_JH.emb)"""
+    return os.path.splitext(bank_path)[0] + ".emb"
+
+
+class EmbeddingCache:
+    """
+    문장 임베딩 디스크 캐시
+    - 키: sha1(모델 이름 + 정규화된 문장)
+    - <path>.npy: float32 임베딩 행렬 (mmap으로 로드), <path>.keys.json: 행 순서대로의 키 목록
+    - 뱅크가 그대로면 파일을 복사 없이 그대로 쓰고, 새로 생기거나 바뀐 문장만 인코딩
+    """
+
+    def __init__(self, path: str, model_name: str):
+        self.path = path
+        self.model_name = model_name
+        self.npy_path = path + ".npy"
+        self.keys_path = path + ".keys.json"
+
+    def key(self, text: str) -> str:
+        raw = f"{self.model_name}\n{canonical_phrase(text)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _load(self):
+        if not (os.path.exists(self.npy_path) and os.path.exists(self.keys_path)):
+            return [], None
+        try:
+            with open(self.keys_path, "r", encoding="utf-8") as f:
+                keys = json.load(f)
+            emb = np.load(self.npy_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            print(f"[EmbCache] 캐시를 읽을 수 없어 다시 만듭니다: {e}")
+            return [], None
+        if len(keys) != len(emb):
+            return [], None
+        return keys, emb
+
+    def _save(self, keys, emb: np.ndarray):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_npy = self.npy_path + ".tmp.npy"
+        tmp_keys = self.keys_path + ".tmp"
+        try:
+            np.save(tmp_npy, emb)
+            with open(tmp_keys, "w", encoding="utf-8") as f:
+                json.dump(keys, f)
+            os.replace(tmp_npy, self.npy_path)
+            os.replace(tmp_keys, self.keys_path)
+        except OSError as e:
+            print(f"[EmbCache] 캐시 저장 실패: {e}")
+
+    def get_or_encode(self, texts, encode_fn) -> np.ndarray:
+        """
+        texts 순서대로의 임베딩 (N, dim) 반환
+        :param encode_fn: 캐시에 없는 문장 리스트 -> float32 (M, dim) 정규화 임베딩
+        """
+        keys = [self.key(t) for t in texts]
+        cached_keys, cached_emb = self._load()
+        if cached_emb is not None and cached_keys == keys:
+            return cached_emb  # 변경 없음: mmap 그대로 (zero-copy)
+        if not keys:
+            # 인코딩할 것이 없음 (차원은 캐시가 있을 때만 알 수 있음, 빈 파일은 저장하지 않음)
+            return np.zeros((0, cached_emb.shape[1] if cached_emb is not None else 0), dtype=np.float32)
+
+        row_of = {k: i for i, k in enumerate(cached_keys)}
+        missing = {}
+        for i, k in enumerate(keys):
+            if k not in row_of and k not in missing:
+                missing[k] = texts[i]
+
+        new_emb = {}
+        if missing:
+            print(f"[EmbCache] {len(missing)}/{len(texts)}개 문장 새로 인코딩")
+            enc = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            new_emb = dict(zip(missing.keys(), enc))
+
+        dim = cached_emb.shape[1] if cached_emb is not None else next(iter(new_emb.values())).shape[0]
+        out = np.empty((len(texts), dim), dtype=np.float32)
+        for i, k in enumerate(keys):
+            out[i] = cached_emb[row_of[k]] if k in row_of else new_emb[k]
+
+        cached_emb = None  # Windows에서는 mmap이 열려 있으면 파일 교체가 안 됨
+        self._save(keys, out)  # 뱅크 순서로 저장 -> 다음 실행은 zero-copy
+        return out
@@ -0,0 +1,207 @@
+"""
+인텐트 뱅크 오프라인 평가 / 벤치마크
+
+    python -m src.eval_intents --bank data/intent_bank_JH.json
+    python -m src.eval_intents --bank data/intent_bank_JH.json --pooling mean --confusion 0.55
+    python -m src.eval_intents --bank data/intent_bank_JH.json --replay logs/latency_log_xxx.csv
+    python -m src.eval_intents --bank data/intent_bank_JH.json --ann 20000,50000
+
+- leave-one-out: 예문 하나를 빼고 나머지 뱅크로 분류 (임베딩은 한 번만 계산, 행렬곱으로 한 번에)
+- threshold별 정확도 / UNKNOWN 비율 / 오분류 비율, 지정한 threshold의 혼동 행렬
+- 처리량: route() 한 개씩 vs route_many() 배치
+- ANN: 뱅크 임베딩을 흔들어 만든 큰 합성 뱅크에서 IVF vs 전수 비교 recall@k / 쿼리당 지연시간
+"""
+import argparse
+import csv
+import time
+
+import numpy as np
+
+from src.ann_index import ANN_N_PROBE, benchmark
+from src.intent_index import IntentIndex
+from src.minilm import MiniLMRetriever
+from src.router import IntentRouter
+
+UNKNOWN = "UNKNOWN"
+LOO_BLOCK = 1024  # leave-one-out 유사도 행렬을 이 행 수씩 계산 (n x n 전체를 만들지 않음)
+
+
+def loo_scores(index) -> np.ndarray:
+    """
+    leave-one-out 인텐트 점수 (예문 수, 인텐트 수), index 정렬 순서 기준
+    - 각 예문을 자기 자신이 빠진 뱅크와 비교한 것과 같은 값을 행렬 연산으로 계산
+    - max/mean은 LOO_BLOCK 행씩 계산해서 메모리는 (LOO_BLOCK, 예문 수)만 사용
+    """
+    emb, ids, starts, counts = index.emb, index.ids, index.starts, index.counts
+    n, n_int = len(ids), len(starts)
+    own = np.zeros((n, n_int), dtype=bool)
+    own[np.arange(n), ids] = True
+
+    if index.pooling == "centroid":
+        sums = np.add.reduceat(emb, starts, axis=0)  # (인텐트, dim) 정규화 전 합
+        dots = emb @ sums.T
+        sq = (sums * sums).sum(axis=1)[None, :]
+        # 자기 인텐트는 자기 벡터를 뺀 합과 비교
+        num = np.where(own, dots - 1.0, dots)
+        den = np.sqrt(np.where(own, sq - 2.0 * dots + 1.0, sq))
+        scores = num / np.clip(den, 1e-12, None)
+        scores[own & (counts[None, :] <= 1)] = -np.inf
+        return scores
+
+    scores = np.empty((n, n_int), dtype=np.float32)
+    for i in range(0, n, LOO_BLOCK):
+        rows = np.arange(i, min(i + LOO_BLOCK, n))
+        sim = emb[rows] @ emb.T
+        if index.pooling == "max":
+            sim[rows - i, rows] = -np.inf  # 자기 자신 제외
+            scores[rows] = np.maximum.reduceat(sim, starts, axis=1)
+        else:
+            sim[rows - i, rows] = 0.0
+            scores[rows] = np.add.reduceat(sim, starts, axis=1)
+
+    if index.pooling == "mean":
+        cnt = counts[None, :] - own
+        scores /= np.clip(cnt, 1, None)
+        scores[cnt == 0] = -np.inf
+    return scores
+
+
+def threshold_table(true, top, best, thresholds):
+    print(f"\n{'threshold':>9}  {'accuracy':>8}  {'unknown':>8}  {'wrong':>8}")
+    for t in thresholds:
+        accepted = best >= t
+        correct = accepted & (top == true)
+        wrong = accepted & (top != true)
+        print(f"{t:9.2f}  {correct.mean():8.1%}  {(~accepted).mean():8.1%}  {wrong.mean():8.1%}")
+
+
+def confusion(true, top, best, threshold, names):
+    labels = names + [UNKNOWN]
+    pred = np.where(best >= threshold, top, len(names))
+    mat = np.zeros((len(names), len(labels)), dtype=int)
+    np.add.at(mat, (true, pred), 1)
+
+    width = max(len(x) for x in labels) + 1
+    print(f"\n[Confusion @ {threshold:.2f}] rows=true, cols=pred")
+    print(" " * width + "".join(f"{x[:8]:>9}" for x in labels))
+    for i, name in enumerate(names):
+        print(f"{name:<{width}}" + "".join(f"{v:9d}" for v in mat[i]))
+
+
+def _clear_caches(router):
+    router.cache.clear()
+    router.retriever.query_cache.clear()
+
+
+def throughput(router, texts, repeat: int = 1):
+    """캐시를 비운 상태에서 측정 (반복 발화 캐시 효과는 제외)"""
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        _clear_caches(router)
+        for t in texts:
+            router.route(t)
+    single = len(texts) * repeat / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        _clear_caches(router)
+        router.route_many(texts)
+    batch = len(texts) * repeat / (time.perf_counter() - t0)
+    return single, batch
+
+
+def synthetic_bank(index, size: int, noise: float = 0.05, seed: int = 0):
+    """실제 뱅크 임베딩에 잡음을 더해 size개짜리 합성 뱅크 -> (임베딩, 인텐트 id)"""
+    rng = np.random.default_rng(seed)
+    src = rng.integers(0, len(index), size=size)
+    emb = index.emb[src] + rng.normal(0.0, noise, size=(size, index.emb.shape[1])).astype(np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    return emb.astype(np.float32), index.ids[src]
+
+
+def ann_report(index, sizes, k: int = 3, n_queries: int = 200, n_probe: int = ANN_N_PROBE):
+    """합성 뱅크 크기별로 예문 recall@10, 1위 인텐트 일치율, 쿼리당 지연시간 (전수 비교 vs IVF)"""
+    print(f"\n{'examples':>9}  {'lists':>5}  {'build':>6}  {'recall@10':>9}  {'top1':>6}  "
+          f"{'exact ms':>8}  {'ann ms':>7}")
+    for size in sizes:
+        emb, ids = synthetic_bank(index, size)
+        queries, _ = synthetic_bank(index, n_queries, seed=1)
+        stats = benchmark(emb, queries, k=10, n_probe=n_probe)
+
+        names = [index.intent_names[i] for i in ids]
+        texts = [str(i) for i in range(size)]
+        exact = IntentIndex(emb, names, texts, "max", ann=False)
+        approx = IntentIndex(emb, names, texts, "max", ann=True)
+        approx.ann.n_probe = min(n_probe, approx.ann.n_lists)
+
+        t0 = time.perf_counter()
+        ref = [exact.topk(q, k) for q in queries]
+        exact_ms = (time.perf_counter() - t0) / n_queries * 1000
+        t0 = time.perf_counter()
+        got = [approx.topk(q, k) for q in queries]
+        ann_ms = (time.perf_counter() - t0) / n_queries * 1000
+        top1 = np.mean([a[0]["intent"] == r[0]["intent"] for a, r in zip(got, ref)])
+        print(f"{size:9d}  {stats['n_lists']:5d}  {stats['build_s']:5.2f}s  {stats['recall']:9.1%}  "
+              f"{top1:6.1%}  {exact_ms:8.3f}  {ann_ms:7.3f}")
+
+
+def load_replay(path: str):
+    """MetricsCSV 로그(text 열) 또는 한 줄에 한 발화인 텍스트 파일"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        if path.endswith(".csv"):
+            return [row["text"] for row in csv.DictReader(f) if row.get("text")]
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인텐트 뱅크 leave-one-out 평가 및 처리량 측정")
+    parser.add_argument("--bank", default="data/intent_bank_JH.json")
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx"])
+    parser.add_argument("--pooling", default="max", choices=["max", "mean", "centroid"])
+    parser.add_argument("--thresholds", default="0.30:0.90:0.05", help="start:stop:step")
+    parser.add_argument("--confusion", type=float, default=0.55, help="혼동 행렬을 볼 threshold")
+    parser.add_argument("--replay", default=None, help="라우팅해 볼 로그 (csv 또는 txt)")
+    parser.add_argument("--ann", default=None, help="IVF를 비교해 볼 합성 뱅크 크기, 예: 20000,50000")
+    parser.add_argument("--nprobe", type=int, default=ANN_N_PROBE)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    retriever = MiniLMRetriever.from_bank_file(args.bank, backend=args.backend, pooling=args.pooling)
+    print(f"[Eval] {len(retriever.texts)} examples, {retriever.index.n_intents} intents, "
+          f"load {time.perf_counter() - t0:.2f}s ({args.backend}, {args.pooling})")
+
+    # leave-one-out
+    index = retriever.index
+    scores = loo_scores(index)
+    top = scores.argmax(axis=1)
+    best = scores[np.arange(len(top)), top]
+    start, stop, step = (float(x) for x in args.thresholds.split(":"))
+    thresholds = np.arange(start, stop + 1e-9, step)
+    threshold_table(index.ids, top, best, thresholds)
+    confusion(index.ids, top, best, args.confusion, index.intent_names)
+
+    # 처리량 (뱅크 문장은 1단계에서 바로 맞으므로 MiniLM만 측정)
+    router = IntentRouter(retriever, threshold=args.confusion, lexical=False)
+    single, batch = throughput(router, retriever.texts)
+    print(f"\n[Throughput] route(): {single:.1f} q/s   route_many(): {batch:.1f} q/s")
+
+    if args.replay:
+        texts = load_replay(args.replay)
+        router = IntentRouter(retriever, threshold=args.confusion)
+        t0 = time.perf_counter()
+        results = router.route_many(texts)
+        dt = time.perf_counter() - t0
+        counts = {}
+        for chosen, _ in results:
+            key = (chosen["intent"], chosen.get("source", "minilm"))
+            counts[key] = counts.get(key, 0) + 1
+        print(f"\n[Replay] {len(texts)} utterances in {dt:.2f}s")
+        for (intent, source), c in sorted(counts.items(), key=lambda x: -x[1]):
+            print(f"- {intent:10s} {source:8s} {c}")
+
+    if args.ann:
+        ann_report(index, [int(x) for x in args.ann.split(",")], n_probe=args.nprobe)
+
+
+if __name__ == "__main__":
+    main()
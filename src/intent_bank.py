@@ -0,0 +1,122 @@
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from src.text_utils import canonical_phrase, normalize_text
+
+ARTIFACT_SUFFIX = ".bank.npz"
+
+
+def read_bank_file(path: str):
+    """원본 바이트와 그 sha1 (파싱과 해시가 같은 내용을 보도록 파일은 한 번만 읽음)"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return raw, hashlib.sha1(raw).hexdigest()
+
+
+def load_intent_bank(path: str):
+    """인텐트 뱅크 JSON 파일 읽기 (형식은 parse_intent_bank 참고)"""
+    return parse_intent_bank(read_bank_file(path)[0], path)
+
+
+def read_intent_bank(path: str):
+    """load_intent_bank()와 같고, 읽은 내용의 sha1도 같이 반환 -> (bank, sha1)"""
+    raw, sha1 = read_bank_file(path)
+    return parse_intent_bank(raw, path), sha1
+
+
+def parse_intent_bank(raw: bytes, source: str = ""):
+    """
+    인텐트 뱅크 JSON 파싱 -> [{"intent", "text"}, ...]
+    - 리스트 형식: [{"intent": "STOP", "text": "stop"}, ...]   (intent_bank.json, intent_bank_en.json)
+    - 묶음 형식:   {"STOP": ["Stop.", "Stop now.", ...], ...}   (intent_bank_JH.json)
+    - 공백/유니코드 정리 후 같은 인텐트 안의 중복 문장(대소문자/문장부호만 다른 것 포함)은 하나만 남김
+    """
+    data = json.loads(raw.decode("utf-8"))
+
+    if isinstance(data, dict):
+        items = [(intent, text) for intent, texts in data.items() for text in texts]
+    elif isinstance(data, list):
+        items = [(x["intent"], x["text"]) for x in data]
+    else:
+        raise ValueError(f"지원하지 않는 인텐트 뱅크 형식: {source}")
+
+    bank, seen, owner = [], set(), {}
+    for intent, text in items:
+        text = canonical_phrase(str(text))
+        norm = normalize_text(text)
+        if not norm or (intent, norm) in seen:
+            continue
+        seen.add((intent, norm))
+        if norm in owner and owner[norm] != intent:
+            print(f"[Bank] 같은 문장이 여러 인텐트에 있습니다: '{text}' ({owner[norm]}, {intent})")
+        owner.setdefault(norm, intent)
+        bank.append({"intent": intent, "text": text})
+    return bank
+
+
+def artifact_path(bank_path: str) -> str:
+    """data/intent_bank_JH.json -> data/intent_bank_JH.bank.npz"""
+    return os.path.splitext(bank_path)[0] + ARTIFACT_SUFFIX
+
+
+def save_compiled_bank(path: str, intent_bank, embeddings, fingerprint: str, source_sha1: str):
+    """문장, 인텐트 id, 임베딩, 모델 fingerprint, 원본 JSON 해시를 한 파일로 저장"""
+    names = list(dict.fromkeys(x["intent"] for x in intent_bank))
+    name_to_id = {n: i for i, n in enumerate(names)}
+    tmp = path + ".tmp.npz"
+    try:
+        np.savez(
+            tmp,
+            texts=np.array([x["text"] for x in intent_bank]),
+            intent_names=np.array(names),
+            intent_ids=np.array([name_to_id[x["intent"]] for x in intent_bank], dtype=np.int32),
+            embeddings=np.asarray(embeddings, dtype=np.float32),
+            fingerprint=np.array(fingerprint),
+            source_sha1=np.array(source_sha1),
+        )
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[Bank] 컴파일된 뱅크 저장 실패: {e}")
+
+
+def load_compiled_bank(path: str, fingerprint: str, source_sha1: str = None):
+    """
+    컴파일된 뱅크 읽기 -> (intent_bank, embeddings)
+    - 파일이 없거나, 모델이 다르거나, 원본 JSON이 바뀌었으면 None
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["fingerprint"]) != fingerprint:
+                return None
+            if source_sha1 is not None and str(data["source_sha1"]) != source_sha1:
+                return None
+            names = data["intent_names"].tolist()
+            bank = [{"intent": names[i], "text": t}
+                    for i, t in zip(data["intent_ids"].tolist(), data["texts"].tolist())]
+            return bank, data["embeddings"]
+    except (OSError, KeyError, ValueError) as e:
+        print(f"[Bank] 컴파일된 뱅크를 읽을 수 없습니다: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인텐트 뱅크 컴파일 (JSON -> 문장/인텐트/임베딩 .bank.npz)")
+    parser.add_argument("bank", help="인텐트 뱅크 JSON (리스트/묶음 형식 모두 가능)")
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx"])
+    args = parser.parse_args()
+
+    from src.minilm import MiniLMRetriever
+
+    retriever = MiniLMRetriever.from_bank_file(args.bank, backend=args.backend)
+    print(f"[Bank] {len(retriever.texts)} phrases, {retriever.index.n_intents} intents "
+          f"-> {artifact_path(args.bank)}")
+
+
+if __name__ == "__main__":
+    main()
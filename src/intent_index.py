@@ -0,0 +1,108 @@
+import numpy as np
+
+from src.ann_index import ANN_CANDIDATES, ANN_MIN_SIZE, IVFIndex
+
+POOLING_MODES = ("max", "mean", "centroid")
+
+
+class IntentIndex:
+    """
+    인텐트 단위 점수 인덱스
+    - 뱅크 임베딩을 인텐트별로 모아 둔 연속 float32 행렬 + 행마다의 인텐트 id 배열
+    - 쿼리 하나당 행렬곱 한 번으로 인텐트별 점수 계산 (torch 텐서 변환 없음)
+    - pooling: "max"(가장 비슷한 예문), "mean"(예문 점수 평균), "centroid"(인텐트 평균 벡터와 비교)
+    - ann: None이면 예문이 ANN_MIN_SIZE개 이상일 때만 IVF 근사 탐색 사용 (max pooling 전용)
+    """
+
+    def __init__(self, embeddings, intents, texts, pooling: str = "max", ann: bool = None):
+        if pooling not in POOLING_MODES:
+            raise ValueError(f"알 수 없는 pooling: {pooling} (가능: {', '.join(POOLING_MODES)})")
+        if len(intents) == 0:
+            raise ValueError("인텐트 뱅크가 비어 있습니다")
+        self.pooling = pooling
+
+        # 인텐트 이름 -> id (뱅크에 처음 나온 순서)
+        self.intent_names = list(dict.fromkeys(intents))
+        name_to_id = {name: i for i, name in enumerate(self.intent_names)}
+        ids = np.array([name_to_id[x] for x in intents], dtype=np.int32)
+
+        # 같은 인텐트 예문이 연속되도록 정렬 (이미 묶여 있으면 복사하지 않음)
+        order = np.argsort(ids, kind="stable")
+        if np.array_equal(order, np.arange(len(ids))):
+            self.emb = np.asarray(embeddings, dtype=np.float32)
+        else:
+            self.emb = np.ascontiguousarray(np.asarray(embeddings)[order], dtype=np.float32)
+        self.ids = ids[order]
+        self.texts = [texts[i] for i in order]
+
+        self.starts = np.flatnonzero(np.r_[True, self.ids[1:] != self.ids[:-1]])
+        self.counts = np.diff(np.r_[self.starts, len(self.ids)])
+
+        centroids = np.add.reduceat(self.emb, self.starts, axis=0)
+        centroids /= np.clip(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12, None)
+        self.centroids = centroids.astype(np.float32)
+
+        # centroid는 원래 인텐트 수만큼만 비교하고, mean은 모든 예문 점수가 필요하므로 근사 탐색 안 함
+        if ann is None:
+            ann = len(self.ids) >= ANN_MIN_SIZE
+        self.ann = IVFIndex(self.emb) if ann and pooling == "max" else None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_intents(self):
+        return len(self.intent_names)
+
+    def intent_scores(self, q_emb: np.ndarray):
+        """
+        q_emb: (dim,) 또는 (B, dim)
+        -> (인텐트별 점수 (..., 인텐트 수), 예문별 점수 (..., 예문 수) 또는 None)
+        """
+        if self.pooling == "centroid":
+            return q_emb @ self.centroids.T, None
+        ex = q_emb @ self.emb.T
+        if self.pooling == "max":
+            return np.maximum.reduceat(ex, self.starts, axis=-1), ex
+        return np.add.reduceat(ex, self.starts, axis=-1) / self.counts, ex
+
+    def _best_text(self, intent_id: int, q_emb: np.ndarray, ex_scores):
+        """해당 인텐트에서 쿼리와 가장 비슷한 예문"""
+        s, n = self.starts[intent_id], self.counts[intent_id]
+        seg = ex_scores[s:s + n] if ex_scores is not None else self.emb[s:s + n] @ q_emb
+        return self.texts[s + int(np.argmax(seg))]
+
+    def topk(self, q_emb: np.ndarray, k: int = 3):
+        """상위 k개 인텐트: [{"intent", "text", "score"}, ...] (점수 내림차순)"""
+        return self.topk_batch(q_emb[None, :], k)[0]
+
+    def _topk_ann(self, q_emb: np.ndarray, k: int):
+        """IVF로 가까운 예문 ANN_CANDIDATES개만 뽑아 인텐트별 max (후보에 없는 인텐트는 제외)"""
+        rows, scores = self.ann.search(q_emb, max(ANN_CANDIDATES, k))
+        ids = self.ids[rows]
+        # 점수 내림차순이므로 인텐트별 첫 등장이 그 인텐트의 최고 점수
+        _, first = np.unique(ids, return_index=True)
+        return [{
+            "intent": self.intent_names[ids[j]],
+            "text": self.texts[rows[j]],
+            "score": float(scores[j]),
+        } for j in np.sort(first)[:k].tolist()]
+
+    def topk_batch(self, q_embs: np.ndarray, k: int = 3):
+        """쿼리 B개를 행렬곱 한 번으로 채점 -> 쿼리별 topk 결과 리스트"""
+        if self.ann is not None:
+            return [self._topk_ann(q, k) for q in q_embs]
+        scores, ex = self.intent_scores(q_embs)
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        top = np.take_along_axis(top, np.argsort(-top_scores, axis=1), axis=1)
+
+        results = []
+        for b in range(len(q_embs)):
+            results.append([{
+                "intent": self.intent_names[i],
+                "text": self._best_text(i, q_embs[b], ex[b] if ex is not None else None),
+                "score": float(scores[b, i]),
+            } for i in top[b].tolist()])
+        return results
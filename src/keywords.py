@@ -0,0 +1,91 @@
+"""
+안전/이동 키워드 매칭 (combined.py, voice_stop.py, run_ivstest_text.py 공용)
+
+- 카테고리별 키워드를 정규식 하나(alternation)로 미리 컴파일해서 한 번 훑으면 모든 검출 결과가 나옴
+- 영어는 단어 경계로 매칭 ("go"가 "good"에, "arm"이 "alarm"에 걸리지 않음)
+- 경계는 영문/숫자만 보므로 한국어는 조사가 붙어도 매칭 ("멈춰요", "정지해")
+"""
+import re
+from collections import namedtuple
+
+# 카테고리 -> 키워드 (dict 순서 = 우선순위, 앞일수록 먼저)
+# 영어는 경계가 엄격하므로 활용형도 직접 적어 둠 ("stopping"이 "stop"에 걸리지 않음)
+PAIN_KEYWORDS = ["it hurts", "hurt", "hurts", "hurting", "pain", "pains", "painful", "ouch"]
+STOP_KEYWORDS = [
+    "stop", "stops", "stopped", "stopping",
+    "pause", "paused", "pausing",
+    "hold on", "holding on", "hold it",
+    "wait", "waiting",
+    "halt", "halted", "halting",
+    "freeze", "freezing", "froze", "frozen",
+    "emergency",
+    "멈춰", "정지", "위험", "스탑",
+]
+# 문맥에 따라 정지가 아닐 수 있는 말 ("not bad at all"): voice_stop.py 감시에서만 사용
+VOICE_STOP_EXTRA_KEYWORDS = ["bad", "turn off"]
+START_KEYWORDS = ["start", "begin", "continue", "go", "resume", "arm"]
+
+SAFETY_KEYWORDS = {
+    "PAIN": PAIN_KEYWORDS,
+    "STOP": STOP_KEYWORDS,
+    "START": START_KEYWORDS,
+}
+EMERGENCY_CATEGORIES = ("PAIN", "STOP")  # 로봇을 바로 멈춰야 하는 카테고리
+
+KeywordHit = namedtuple("KeywordHit", ["category", "keyword", "priority", "start", "end"])
+
+
+class KeywordMatcher:
+    """
+    여러 카테고리 키워드를 한 번에 찾는 매처
+    - groups: {카테고리: [키워드, ...]}, 앞에 있는 카테고리일수록 우선순위가 높음 (priority 0)
+    - 같은 위치에서는 긴 키워드가 먼저 맞음 ("it hurts" > "hurt", "backward" > "back")
+    """
+
+    def __init__(self, groups: dict):
+        self.categories = list(groups)
+        self._owner = {}
+        for prio, (category, words) in enumerate(groups.items()):
+            for w in words:
+                key = " ".join(w.casefold().split())
+                if self._owner.get(key, (category,))[0] != category:
+                    raise ValueError(f"키워드 '{w}'가 여러 카테고리에 있습니다: {self._owner[key][0]}, {category}")
+                self._owner[key] = (category, prio)
+
+        alts = sorted(self._owner, key=len, reverse=True)
+        body = "|".join(re.escape(w).replace(r"\ ", r"\s+") for w in alts)
+        self.pattern = re.compile(rf"(?<![a-z0-9])(?:{body})(?![a-z0-9])")
+
+    def find_all(self, text: str):
+        """모든 검출 결과 (텍스트 순서)"""
+        hits = []
+        for m in self.pattern.finditer(text.casefold()):
+            keyword = " ".join(m.group(0).split())
+            category, prio = self._owner[keyword]
+            hits.append(KeywordHit(category, keyword, prio, m.start(), m.end()))
+        return hits
+
+    def first(self, text: str, categories=None):
+        """우선순위가 가장 높은 검출 결과 (같으면 앞에 나온 것), 없으면 None"""
+        hits = self.find_all(text)
+        if categories is not None:
+            hits = [h for h in hits if h.category in categories]
+        return min(hits, key=lambda h: (h.priority, h.start)) if hits else None
+
+
+SAFETY_MATCHER = KeywordMatcher(SAFETY_KEYWORDS)
+VOICE_STOP_MATCHER = KeywordMatcher({
+    "PAIN": PAIN_KEYWORDS,
+    "STOP": STOP_KEYWORDS + VOICE_STOP_EXTRA_KEYWORDS,
+})
+
+
+def safety_category(text: str):
+    """PAIN > STOP > START 순으로 안전 키워드 카테고리, 없으면 None"""
+    hit = SAFETY_MATCHER.first(text)
+    return hit.category if hit else None
+
+
+def emergency_hit(text: str, matcher: KeywordMatcher = SAFETY_MATCHER):
+    """PAIN/STOP 키워드 검출 결과 (비상 정지 판단은 모두 이 함수 기준)"""
+    return matcher.first(text, EMERGENCY_CATEGORIES)
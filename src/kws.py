@@ -0,0 +1,304 @@
+"""
+STOP/PAIN 키워드 스포터 (위스퍼를 거치지 않는 비상 정지 경로)
+
+- 30ms 청크마다 MFCC 프레임을 뽑아 최근 WINDOW_SEC 구간과 등록된 템플릿을 DTW로 비교
+- 템플릿은 사용자가 직접 녹음해서 등록 (python -m src.kws enroll STOP --n 5)
+- 위스퍼는 이후 확인용으로만 사용
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 25
+HOP_MS = 10
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+
+WINDOW_SEC = 1.2  # 최근 이 구간 안에서 키워드를 찾음
+END_SLACK_FRAMES = 5  # 키워드 끝이 최근 5프레임(50ms) 안에 있어야 인정 (중복 검출 방지)
+REFRACTORY_SEC = 1.5  # 한 번 검출하면 이 시간 동안은 무시
+ENERGY_THRESHOLD = 0.012  # combined.ENERGY_THRESHOLD와 같은 기준, 조용할 땐 DTW 생략
+THRESHOLD_MARGIN = 1.2  # 등록 샘플끼리의 최대 거리 * margin = 검출 임계값
+MIN_ENROLL = 2  # 임계값을 정하려면 샘플끼리 비교해야 하므로 최소 2개
+
+DEFAULT_TEMPLATE_PATH = os.path.join("data", "kws_templates.npz")
+
+
+def _mel_filterbank(sr: int, n_fft: int, n_mels: int) -> np.ndarray:
+    def hz2mel(f):
+        return 2595.0 * np.log10(1.0 + f / 700.0)
+
+    def mel2hz(m):
+        return 700.0 * (10 ** (m / 2595.0) - 1.0)
+
+    mels = np.linspace(hz2mel(0.0), hz2mel(sr / 2.0), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel2hz(mels) / sr).astype(int)
+    fb = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        for k in range(left, center):
+            fb[m - 1, k] = (k - left) / max(center - left, 1)
+        for k in range(center, right):
+            fb[m - 1, k] = (right - k) / max(right - center, 1)
+    return fb
+
+
+def _dct_matrix(n_mfcc: int, n_mels: int) -> np.ndarray:
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)[:, None]
+    return (np.sqrt(2.0 / n_mels) * np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels))).astype(np.float32)
+
+
+class MfccExtractor:
+    """청크 단위 스트리밍 MFCC (청크 경계에 걸친 프레임도 이어서 계산)"""
+
+    def __init__(self, sr: int = SAMPLE_RATE):
+        self.frame_len = int(sr * FRAME_MS / 1000)
+        self.hop = int(sr * HOP_MS / 1000)
+        self.window = np.hamming(self.frame_len).astype(np.float32)
+        self.fb = _mel_filterbank(sr, N_FFT, N_MELS)
+        self.dct = _dct_matrix(N_MFCC, N_MELS)
+        self._rest = np.zeros(0, dtype=np.float32)
+        self._last_sample = 0.0
+
+    def reset(self):
+        self._rest = np.zeros(0, dtype=np.float32)
+        self._last_sample = 0.0
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """chunk -> (새 프레임 수, N_MFCC - 1)"""
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if len(chunk) == 0:
+            return np.zeros((0, N_MFCC - 1), dtype=np.float32)
+
+        # pre-emphasis (이전 청크의 마지막 샘플과 이어서)
+        emph = np.empty_like(chunk)
+        emph[0] = chunk[0] - 0.97 * self._last_sample
+        emph[1:] = chunk[1:] - 0.97 * chunk[:-1]
+        self._last_sample = float(chunk[-1])
+
+        buf = np.concatenate([self._rest, emph])
+        if len(buf) < self.frame_len:
+            self._rest = buf
+            return np.zeros((0, N_MFCC - 1), dtype=np.float32)
+
+        frames = np.lib.stride_tricks.sliding_window_view(buf, self.frame_len)[::self.hop]
+        self._rest = buf[len(frames) * self.hop:]
+
+        spec = np.abs(np.fft.rfft(frames * self.window, n=N_FFT)) ** 2
+        mel = np.log(spec @ self.fb.T + 1e-10)
+        # c0(음량)는 빼서 말하는 크기에 덜 민감하게 함
+        return (mel @ self.dct.T)[:, 1:].astype(np.float32)
+
+
+def mfcc(audio: np.ndarray, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """한 번에 전체 오디오의 MFCC"""
+    return MfccExtractor(sr).process(audio)
+
+
+def dtw_cost(template: np.ndarray, window: np.ndarray) -> np.ndarray:
+    """
+    subsequence DTW: 템플릿이 window 어디서든 시작할 수 있고,
+    반환값[j] = window의 j번째 프레임에서 끝나는 최적 정합 비용 / 템플릿 길이
+    - 허용 스텝: (1,1), (1,2), (2,1) -> 정합 구간 길이는 템플릿의 0.5~2배
+    - 행 단위로 벡터화 (템플릿 프레임 수만큼만 파이썬 루프)
+    """
+    m, n = len(template), len(window)
+    cost = np.sqrt(((template[:, None, :] - window[None, :, :]) ** 2).sum(axis=-1))
+    inf = np.float32(np.inf)
+    prev2 = np.full(n, inf, dtype=np.float32)
+    prev = cost[0].copy()
+    for i in range(1, m):
+        best = np.full(n, inf, dtype=np.float32)
+        best[1:] = prev[:-1]
+        best[2:] = np.minimum(best[2:], prev[:-2])
+        best[1:] = np.minimum(best[1:], prev2[:-1])
+        cur = cost[i] + best
+        prev2, prev = prev, cur
+    return prev / m
+
+
+class KeywordSpotter:
+    """
+    MFCC + DTW 템플릿 매칭 키워드 스포터
+    - process(chunk)를 30ms 청크마다 호출, 검출되면 (label, 거리) 반환
+    - templates: {label: [MFCC 배열, ...]}, thresholds: {label: 거리 임계값}
+    """
+
+    def __init__(self, templates: dict, thresholds: dict, sr: int = SAMPLE_RATE):
+        self.templates = templates
+        self.thresholds = thresholds
+        self.extractor = MfccExtractor(sr)
+        self.sr = sr
+
+        self.window_frames = int(WINDOW_SEC * 1000 / HOP_MS)
+        self._window = np.zeros((self.window_frames, N_MFCC - 1), dtype=np.float32)
+        self._filled = 0
+        self._speech_hold = 0  # 마지막 말소리 이후 남은 프레임 수 (0이면 DTW 생략)
+        self._last_hit = 0.0
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TEMPLATE_PATH, sr: int = SAMPLE_RATE):
+        """템플릿 파일이 없으면 None"""
+        if not os.path.exists(path):
+            return None
+        templates, thresholds = load_templates(path)
+        # 예전에 샘플 1개로 등록해서 임계값이 inf인 라벨은 모든 소리에 걸리므로 제외
+        for label in [k for k, v in thresholds.items() if not np.isfinite(v)]:
+            print(f"[KWS] '{label}' 임계값이 유효하지 않아 제외합니다. 다시 등록해주세요.")
+            templates.pop(label, None)
+        if not templates:
+            return None
+        return cls(templates, thresholds, sr=sr)
+
+    def reset(self):
+        self.extractor.reset()
+        self._filled = 0
+        self._speech_hold = 0
+
+    def _push_frames(self, feats: np.ndarray):
+        k = len(feats)
+        if k >= self.window_frames:
+            self._window[:] = feats[-self.window_frames:]
+        else:
+            self._window[:-k] = self._window[k:]
+            self._window[-k:] = feats
+        self._filled = min(self._filled + k, self.window_frames)
+
+    def process(self, chunk: np.ndarray):
+        feats = self.extractor.process(chunk)
+        if len(feats) == 0:
+            return None
+        self._push_frames(feats)
+
+        rms = float(np.sqrt(np.mean(chunk * chunk) + 1e-12))
+        if rms > ENERGY_THRESHOLD:
+            self._speech_hold = self.window_frames
+        else:
+            self._speech_hold = max(self._speech_hold - len(feats), 0)
+        if self._speech_hold == 0:
+            return None
+
+        now = time.time()
+        if now - self._last_hit < REFRACTORY_SEC:
+            return None
+
+        window = self._window[-self._filled:]
+        best_label, best_dist = None, np.inf
+        for label, temps in self.templates.items():
+            for t in temps:
+                if len(window) < len(t) // 2:
+                    continue
+                dist = float(dtw_cost(t, window)[-END_SLACK_FRAMES:].min())
+                if dist < self.thresholds[label] and dist < best_dist:
+                    best_label, best_dist = label, dist
+
+        if best_label is None:
+            return None
+        self._last_hit = now
+        return best_label, best_dist
+
+
+# ======================
+# 템플릿 저장/불러오기/등록
+# ======================
+def load_templates(path: str):
+    data = np.load(path)
+    templates, thresholds = {}, {}
+    for key in data.files:
+        label, _, idx = key.rpartition("__")
+        if idx == "threshold":
+            thresholds[label] = float(data[key])
+        else:
+            templates.setdefault(label, []).append(data[key])
+    return templates, thresholds
+
+
+def save_templates(path: str, templates: dict, thresholds: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    arrays = {}
+    for label, temps in templates.items():
+        for i, t in enumerate(temps):
+            arrays[f"{label}__{i}"] = t
+        arrays[f"{label}__threshold"] = np.float32(thresholds[label])
+    np.savez(path, **arrays)
+
+
+def make_template(audio: np.ndarray, sr: int = SAMPLE_RATE):
+    """녹음에서 말소리 구간만 잘라 템플릿으로 사용"""
+    feats = mfcc(audio, sr)
+
+    hop = int(sr * HOP_MS / 1000)
+    n = len(feats)
+    energy = np.array([
+        np.sqrt(np.mean(audio[i * hop:i * hop + hop] ** 2) + 1e-12) for i in range(n)
+    ])
+    voiced = np.where(energy > ENERGY_THRESHOLD)[0]
+    if len(voiced) == 0:
+        return None
+    start = max(voiced[0] - 3, 0)
+    end = min(voiced[-1] + 4, n)
+    return feats[start:end]
+
+
+def calibrate_threshold(temps: list) -> float:
+    """등록 샘플끼리 서로 맞춰본 최대 거리 * THRESHOLD_MARGIN"""
+    if len(temps) < MIN_ENROLL:
+        raise ValueError(f"임계값을 정하려면 샘플이 {MIN_ENROLL}개 이상 필요합니다 (현재 {len(temps)}개)")
+    dists = []
+    for i, a in enumerate(temps):
+        for j, b in enumerate(temps):
+            if i != j:
+                dists.append(float(dtw_cost(a, b).min()))
+    return max(dists) * THRESHOLD_MARGIN
+
+
+def enroll(label: str, n: int, path: str, seconds: float = 1.5, device=None):
+    if n < MIN_ENROLL:
+        raise ValueError(f"--n은 {MIN_ENROLL} 이상이어야 합니다 (임계값 보정용)")
+    import sounddevice as sd
+
+    templates, thresholds = ({}, {})
+    if os.path.exists(path):
+        templates, thresholds = load_templates(path)
+
+    temps = []
+    while len(temps) < n:
+        input(f"[KWS] Enter 후 '{label}' 라고 말해주세요 ({len(temps) + 1}/{n})")
+        audio = sd.rec(int(seconds * SAMPLE_RATE), samplerate=SAMPLE_RATE,
+                       channels=1, dtype="float32", device=device)
+        sd.wait()
+        t = make_template(audio[:, 0])
+        if t is None:
+            print("[KWS] 소리가 너무 작습니다. 다시 말해주세요.")
+            continue
+        temps.append(t)
+
+    templates[label] = temps
+    thresholds[label] = calibrate_threshold(temps)
+    save_templates(path, templates, thresholds)
+    print(f"[KWS] '{label}' 템플릿 {n}개 저장 (threshold={thresholds[label]:.2f}) -> {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STOP/PAIN 키워드 템플릿 등록")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_enroll = sub.add_parser("enroll")
+    p_enroll.add_argument("label", help="예: STOP, PAIN")
+    p_enroll.add_argument("--n", type=int, default=5)
+    p_enroll.add_argument("--path", default=DEFAULT_TEMPLATE_PATH)
+    p_enroll.add_argument("--device", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.cmd == "enroll":
+        if args.n < MIN_ENROLL:
+            parser.error(f"--n must be >= {MIN_ENROLL}")
+        enroll(args.label.upper(), args.n, args.path, device=args.device)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from collections import Counter, defaultdict
+
+from src.text_utils import normalize_text
+
+LEX_ACCEPT = 0.88  # 글자 3-gram 유사도가 이 이상이면 MiniLM 없이 결정
+LEX_MARGIN = 0.15  # 다른 인텐트 최고 점수와 최소 이만큼 차이가 나야 확신
+
+
+def char_ngrams(text: str, n: int = 3):
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+class LexicalMatcher:
+    """
+    인텐트 뱅크 문장 기반 1단계 매칭 (정규화 후 완전 일치 -> 글자 3-gram 유사도)
+    - 뱅크 문장을 거의 그대로 말한 경우("Stop now.", "Move slowly.")는 여기서 바로 결정
+    - 확신이 없으면 None을 돌려주고 MiniLM 단계로 넘김
+    """
+
+    def __init__(self, texts, intents, accept: float = LEX_ACCEPT, margin: float = LEX_MARGIN):
+        self.accept = accept
+        self.margin = margin
+        self.texts = list(texts)
+        self.intents = list(intents)
+        self.norms = [normalize_text(t) for t in self.texts]
+
+        # 완전 일치: 정규화 문장 -> 예문 번호 (여러 인텐트에 같은 문장이 있으면 애매하므로 제외)
+        self.exact = {}
+        ambiguous = set()
+        for i, norm in enumerate(self.norms):
+            j = self.exact.get(norm)
+            if j is not None and self.intents[j] != self.intents[i]:
+                ambiguous.add(norm)
+            self.exact.setdefault(norm, i)
+        for norm in ambiguous:
+            del self.exact[norm]
+
+        # 3-gram 역색인
+        self.grams = [char_ngrams(n) for n in self.norms]
+        self.postings = defaultdict(list)
+        for i, grams in enumerate(self.grams):
+            for g in grams:
+                self.postings[g].append(i)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, **kwargs):
+        """MiniLMRetriever.snapshot() 한 벌에서 생성 (문장/인텐트가 서로 다른 버전에서 섞이지 않음)"""
+        return cls(snapshot.texts, [x["intent"] for x in snapshot.intent_bank], **kwargs)
+
+    def _scores(self, norm: str):
+        """예문별 Dice 유사도 (겹치는 3-gram이 하나라도 있는 예문만)"""
+        q = char_ngrams(norm)
+        shared = Counter()
+        for g in q:
+            for i in self.postings.get(g, ()):
+                shared[i] += 1
+        return {i: 2.0 * c / (len(q) + len(self.grams[i])) for i, c in shared.items()}
+
+    def candidates(self, text: str, k: int = 3):
+        """인텐트별 최고 점수 후보 (retrieve_topk와 같은 형식)"""
+        norm = normalize_text(text)
+        best = {}
+        for i, score in self._scores(norm).items():
+            intent = self.intents[i]
+            if intent not in best or score > best[intent]["score"]:
+                best[intent] = {"intent": intent, "text": self.texts[i], "score": score}
+        return sorted(best.values(), key=lambda c: -c["score"])[:k]
+
+    def match(self, text: str):
+        """확신하면 (chosen, candidates), 아니면 None"""
+        norm = normalize_text(text)
+        if not norm:
+            return None
+
+        i = self.exact.get(norm)
+        if i is not None:
+            chosen = {"intent": self.intents[i], "text": self.texts[i], "score": 1.0,
+                      "margin": 1.0, "source": "lexical"}
+            return chosen, [dict(chosen)]
+
+        cands = self.candidates(text)
+        if not cands:
+            return None
+        margin = cands[0]["score"] - cands[1]["score"] if len(cands) > 1 else cands[0]["score"]
+        if cands[0]["score"] < self.accept or margin < self.margin:
+            return None
+        return dict(cands[0], margin=margin, source="lexical"), cands
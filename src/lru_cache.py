@@ -0,0 +1,48 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    크기 제한 LRU 캐시 (OrderedDict) + 적중/실패 횟수
+    - 마이크 스레드와 메인 스레드에서 같이 쓰므로 lock으로 보호
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def info(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,81 @@
+"""
+프로세스 전체에서 모델을 한 번만 올리는 공용 레지스트리
+
+- 같은 키(예: ("whisper", "tiny", None))를 요청하면 이미 올라간 모델을 그대로 공유
+- 처음 요청할 때 로드 (키마다 lock이 있어서 두 스레드가 동시에 요청해도 한 번만 로드)
+- 참조 횟수를 세다가 마지막 사용자가 release()하면 레지스트리에서 내려서 메모리 해제
+- 조회/참조 횟수 변경/삭제는 모두 레지스트리 lock 안에서 (로드만 키별 lock, 다른 모델 로드는 막지 않음)
+- use_lock(key): 스레드 안전하지 않은 모델(openai-whisper)을 여러 곳에서 같이 쓸 때 추론을 직렬화
+"""
+import threading
+import time
+
+
+class _Entry:
+    def __init__(self):
+        self.load_lock = threading.Lock()
+        self.use_lock = threading.RLock()
+        self.model = None
+        self.refs = 0
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, key) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            return entry
+
+    def acquire(self, key, factory):
+        """
+        key의 모델을 반환 (없으면 factory()로 로드), 참조 횟수 +1
+        - 참조는 로드 전에 레지스트리 lock 안에서 먼저 잡음 -> 로드 중에 release()가 entry를 지우지 못함
+        - factory가 실패하면 잡아 둔 참조를 돌려놓고 예외를 그대로 올림
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            entry.refs += 1
+        try:
+            with entry.load_lock:
+                if entry.model is None:
+                    t0 = time.perf_counter()
+                    entry.model = factory()
+                    print(f"[Registry] loaded {key} ({time.perf_counter() - t0:.2f}s)")
+                else:
+                    print(f"[Registry] shared {key} (refs {entry.refs})")
+                return entry.model
+        except BaseException:
+            self.release(key)
+            raise
+
+    def release(self, key):
+        """참조 횟수 -1, 0이 되면 모델을 내림"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self._entries[key]
+            entry.model = None
+        print(f"[Registry] released {key}")
+
+    def use_lock(self, key):
+        """같은 모델을 쓰는 모든 곳이 공유하는 추론용 lock"""
+        return self._entry(key).use_lock
+
+    def info(self) -> dict:
+        """{key: 참조 횟수}"""
+        with self._lock:
+            return {key: e.refs for key, e in self._entries.items() if e.model is not None}
+
+
+REGISTRY = ModelRegistry()
@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from src.minilm import MODEL_NAME
+
+ONNX_DIR = os.path.join("data", "minilm_onnx")
+ONNX_MAX_SEQ_LEN = 32  # 명령어는 짧으므로 토큰 길이를 짧게 고정 (sentence-transformers 기본값은 128)
+
+FP32_FILE = "model_fp32.onnx"
+INT8_FILE = "model_int8.onnx"
+CONFIG_FILE = "export_config.json"
+
+PARITY_MIN_COS = 0.98  # torch 임베딩과의 코사인 유사도 최소값
+
+
+class OnnxMiniLMEncoder:
+    """
+    ONNX Runtime + int8 동적 양자화 MiniLM 인코더
+    - SentenceTransformer.encode()와 같은 방식으로 사용 (mean pooling + L2 정규화)
+    - torch / sentence-transformers 없이 onnxruntime + tokenizers만 필요
+    """
+
+    def __init__(self, model_dir: str = ONNX_DIR, num_threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, CONFIG_FILE), "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.max_seq_len = self.config["max_seq_len"]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_len)
+        self.tokenizer.enable_padding(pad_id=self.config["pad_id"], pad_token=self.config["pad_token"])
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, INT8_FILE), opts, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {x.name for x in self.session.get_inputs()}
+
+    def encode(self, texts, normalize_embeddings=True, batch_size=32, convert_to_numpy=True):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        out = []
+        for i in range(0, len(texts), batch_size):
+            encs = self.tokenizer.encode_batch(texts[i:i + batch_size])
+            ids = np.array([e.ids for e in encs], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in encs], dtype=np.int64)
+            feeds = {"input_ids": ids, "attention_mask": mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.zeros_like(ids)
+
+            hidden = self.session.run(None, feeds)[0]  # (B, T, H)
+            m = mask[:, :, None].astype(np.float32)
+            emb = (hidden * m).sum(axis=1) / np.clip(m.sum(axis=1), 1e-9, None)
+            out.append(emb.astype(np.float32))
+
+        emb = np.concatenate(out, axis=0)
+        if normalize_embeddings:
+            emb /= np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12, None)
+        return emb[0] if single else emb
+
+
+def export_onnx(model_name: str = MODEL_NAME, out_dir: str = ONNX_DIR, max_seq_len: int = ONNX_MAX_SEQ_LEN):
+    """transformers 모델 -> ONNX(fp32) -> int8 동적 양자화"""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    dummy = tokenizer(["stop now"], padding="max_length", max_length=max_seq_len,
+                      truncation=True, return_tensors="pt")
+    fp32_path = os.path.join(out_dir, FP32_FILE)
+    int8_path = os.path.join(out_dir, INT8_FILE)
+
+    print(f"[ONNX] Exporting {model_name} -> {fp32_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            model, (dummy["input_ids"], dummy["attention_mask"]), fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "seq"},
+                "attention_mask": {0: "batch", 1: "seq"},
+                "last_hidden_state": {0: "batch", 1: "seq"},
+            },
+            opset_version=14,
+        )
+
+    print(f"[ONNX] Quantizing (int8 dynamic) -> {int8_path}")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "model_name": model_name,
+            "max_seq_len": max_seq_len,
+            "pad_id": tokenizer.pad_token_id,
+            "pad_token": tokenizer.pad_token,
+        }, f, indent=2)
+    print("[ONNX] Done.")
+
+
+def parity_check(texts, model_dir: str = ONNX_DIR, min_cos: float = PARITY_MIN_COS) -> bool:
+    """같은 문장에 대해 torch(sentence-transformers) 임베딩과 ONNX int8 임베딩 비교"""
+    from sentence_transformers import SentenceTransformer
+
+    with open(os.path.join(model_dir, CONFIG_FILE), "r", encoding="utf-8") as f:
+        model_name = json.load(f)["model_name"]
+
+    ref = SentenceTransformer(model_name, device="cpu").encode(texts, normalize_embeddings=True)
+    onnx = OnnxMiniLMEncoder(model_dir).encode(texts)
+    cos = (ref * onnx).sum(axis=1)
+
+    # 검색 결과(최근접 문장)가 같은지도 확인
+    ref_nn = np.argsort(-(ref @ ref.T), axis=1)[:, 1]
+    onnx_nn = np.argsort(-(onnx @ onnx.T), axis=1)[:, 1]
+    agree = float(np.mean(ref_nn == onnx_nn)) if len(texts) > 1 else 1.0
+
+    worst = int(np.argmin(cos))
+    print(f"[Parity] {len(texts)} sentences  cos min={cos.min():.4f} mean={cos.mean():.4f}  "
+          f"nearest-neighbour agreement={agree:.1%}")
+    print(f"[Parity] worst: '{texts[worst]}' ({cos[worst]:.4f})")
+    ok = bool(cos.min() >= min_cos)
+    print("[Parity] OK" if ok else f"[Parity] FAIL (min cos < {min_cos})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MiniLM ONNX int8 export / parity check")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_export = sub.add_parser("export")
+    p_export.add_argument("--out", default=ONNX_DIR)
+    p_export.add_argument("--max-seq-len", type=int, default=ONNX_MAX_SEQ_LEN)
+    p_parity = sub.add_parser("parity")
+    p_parity.add_argument("--bank", default=os.path.join("data", "intent_bank_en.json"))
+    p_parity.add_argument("--dir", default=ONNX_DIR)
+    args = parser.parse_args()
+
+    if args.cmd == "export":
+        export_onnx(out_dir=args.out, max_seq_len=args.max_seq_len)
+    elif args.cmd == "parity":
+        from src.intent_bank import load_intent_bank
+
+        texts = [x["text"] for x in load_intent_bank(args.bank)]
+        raise SystemExit(0 if parity_check(texts, args.dir) else 1)
+
+
+if __name__ == "__main__":
+    main()
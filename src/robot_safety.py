@@ -0,0 +1,21 @@
+"""
+로봇 정지 공용 헬퍼 (combined.py, voice_stop.py, robort_kokoro_main.py)
+
+- RTDE_LOCK: RTDEControlInterface는 스레드 안전하지 않으므로 메인 스레드 이동 명령과
+  KWS/위스퍼 스레드의 정지 명령이 겹치지 않게 모든 rtde_c 호출을 이 lock 안에서 실행
+- 정지를 판단하는 쪽은 lock 안에서 상태(armed/stop_flag)를 먼저 바꾸고 정지,
+  이동하는 쪽은 lock 안에서 상태를 확인하고 이동 -> 정지 직후에 이동 명령이 끼어들지 않음
+"""
+import threading
+
+RTDE_LOCK = threading.RLock()
+STOP_DECEL = 2.0
+
+
+def safe_stop(rtde_c, decel: float = STOP_DECEL):
+    """stopL 실패 시(관절 이동 중 등) stopJ로 정지"""
+    with RTDE_LOCK:
+        try:
+            rtde_c.stopL(decel)
+        except Exception:
+            rtde_c.stopJ(decel)
@@ -0,0 +1,90 @@
+"""
+시작 시 모델 로드 / 로봇 연결을 동시에 실행
+
+    startup = Startup()
+    startup.add("whisper", load_asr_engine, "small", backend="whisper")
+    startup.add("robot", RTDEControlInterface, HOST)
+    parts = startup.wait()      # 모두 끝날 때까지 대기 (준비 완료 barrier) + 시간 보고
+    asr = parts["whisper"]
+
+- 모델 로드는 대부분 파일 I/O와 C 확장(torch/onnxruntime) 안에서 GIL을 놓으므로 스레드로 충분
+- 같은 모델은 src/model_registry.py가 한 번만 올리므로 여러 작업이 같은 모델을 요청해도 안전
+- 무거운 라이브러리는 preimport()로 메인 스레드에서 먼저 import
+  (transformers 등의 lazy import는 스레드 안전하지 않음 -> 풀 스레드는 모델 생성만)
+"""
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def preimport(*modules):
+    """
+    모듈을 지금 스레드(메인)에서 import
+    - 없는 모듈은 건너뜀 (그 모듈이 필요한 구성요소가 로드할 때 원래 오류로 실패)
+    """
+    t0 = time.perf_counter()
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"[Startup] preimport {name} 건너뜀: {e}")
+    print(f"[Startup] imports ({', '.join(modules)}) {time.perf_counter() - t0:.2f}s")
+
+
+class StartupError(RuntimeError):
+    """하나 이상의 구성요소가 시작에 실패"""
+
+
+class Startup:
+    def __init__(self, max_workers: int = 6):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="startup")
+        self._futures = {}
+        self._timings = {}  # name -> (시작 offset, 걸린 시간)
+        self._t0 = time.perf_counter()
+        self.ready = threading.Event()  # wait()가 성공하면 set
+
+    def add(self, name: str, fn, *args, **kwargs):
+        """구성요소 하나를 백그라운드에서 시작"""
+        def _run():
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                self._timings[name] = (start - self._t0, end - start)
+
+        self._futures[name] = self._pool.submit(_run)
+
+    def get(self, name: str, timeout=None):
+        """구성요소 하나만 기다려서 결과 반환 (실패하면 예외)"""
+        return self._futures[name].result(timeout=timeout)
+
+    def wait(self, timeout=None) -> dict:
+        """
+        모든 구성요소가 끝날 때까지 대기 -> {name: 결과}
+        - 시간 보고를 출력한 뒤, 실패한 구성요소가 있으면 StartupError
+        """
+        results, errors = {}, {}
+        for name, fut in self._futures.items():
+            try:
+                results[name] = fut.result(timeout=timeout)
+            except Exception as e:
+                errors[name] = e
+        self._pool.shutdown(wait=False)
+        self.report(errors)
+        if errors:
+            raise StartupError("; ".join(f"{name}: {e}" for name, e in errors.items()))
+        self.ready.set()
+        return results
+
+    def report(self, errors=None):
+        errors = errors or {}
+        total = time.perf_counter() - self._t0
+        serial = sum(d for _, d in self._timings.values())
+        print(f"[Startup] {'component':<12} {'start':>6} {'time':>7}")
+        for name in self._futures:
+            start, dur = self._timings.get(name, (0.0, 0.0))
+            status = f"FAIL ({errors[name]})" if name in errors else "ok"
+            print(f"[Startup] {name:<12} {start:5.2f}s {dur:6.2f}s  {status}")
+        print(f"[Startup] {'failed' if errors else 'ready'} in {total:.2f}s (sequential would be ~{serial:.2f}s)")
@@ -0,0 +1,15 @@
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def canonical_phrase(text: str) -> str:
+    """유니코드 정규화(NFC) + 공백 정리 (대소문자/문장부호는 그대로)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def normalize_text(text: str) -> str:
+    """매칭용 정규화: 소문자 + 문장부호 제거 + 공백 정리 ("Stop now." -> "stop now")"""
+    text = unicodedata.normalize("NFC", text).casefold().replace("'", "").replace("’", "")
+    return " ".join(_NON_WORD.sub(" ", text).split())
@@ -0,0 +1,102 @@
+"""
+고정 안내 문구 음성 캐시 (Kokoro 합성 결과 재사용)
+
+- 키: (모델, 문장, 목소리, 속도, 언어)의 sha1
+- 메모리(dict) + 디스크(data/tts_cache/<sha1>.npz, float32 오디오 + 샘플레이트)
+- 시작할 때 prerender()로 자주 쓰는 문구를 미리 만들어 두면 재생 시 합성 없이 바로 재생
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from src.text_utils import canonical_phrase
+
+TTS_CACHE_DIR = os.path.join("data", "tts_cache")
+
+
+class PhraseAudioCache:
+    def __init__(self, synthesize, cache_dir: str = TTS_CACHE_DIR, model_id: str = ""):
+        """
+        :param synthesize: (text, voice, speed, lang) -> (float32 오디오, 샘플레이트)
+        :param model_id: 모델이 바뀌면 예전 파일을 쓰지 않도록 키에 포함 (예: 모델 파일 이름)
+        """
+        self.synthesize = synthesize
+        self.cache_dir = cache_dir
+        self.model_id = model_id
+        self._mem = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str, voice: str, speed: float, lang: str) -> str:
+        raw = json.dumps([self.model_id, canonical_phrase(text), voice, float(speed), lang], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def get(self, text: str, voice: str, speed: float, lang: str):
+        """캐시에 있으면 (오디오, 샘플레이트), 없으면 None (합성하지 않음)"""
+        key = self.key(text, voice, speed, lang)
+        with self._lock:
+            hit = self._mem.get(key)
+        if hit is None:
+            hit = self._load(key)
+        if hit is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return hit
+
+    def _load(self, key: str):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                hit = (data["audio"].astype(np.float32), int(data["sr"]))
+        except (OSError, KeyError, ValueError) as e:
+            print(f"[TTS Cache] 읽기 실패 ({path}): {e}")
+            return None
+        with self._lock:
+            self._mem[key] = hit
+        return hit
+
+    def _save(self, key: str, audio: np.ndarray, sr: int):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = self._path(key) + ".tmp.npz"
+        try:
+            np.savez(tmp, audio=np.asarray(audio, dtype=np.float32), sr=np.int32(sr))
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            print(f"[TTS Cache] 저장 실패: {e}")
+
+    def get_or_synthesize(self, text: str, voice: str, speed: float, lang: str):
+        """캐시에 없으면 합성해서 메모리/디스크에 저장"""
+        hit = self.get(text, voice, speed, lang)
+        if hit is not None:
+            return hit
+        audio, sr = self.synthesize(text, voice, speed, lang)
+        audio = np.asarray(audio, dtype=np.float32)
+        key = self.key(text, voice, speed, lang)
+        with self._lock:
+            self._mem[key] = (audio, sr)
+        self._save(key, audio, sr)
+        return audio, sr
+
+    def prerender(self, phrases, voice: str, speed: float, lang: str) -> int:
+        """문구 목록을 미리 준비 (디스크에 있으면 읽기만) -> 새로 합성한 개수"""
+        made = 0
+        for text in phrases:
+            key = self.key(text, voice, speed, lang)
+            if key in self._mem or self._load(key) is not None:
+                continue
+            self.get_or_synthesize(text, voice, speed, lang)
+            made += 1
+        return made
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._mem)}
@@ -0,0 +1,122 @@
+"""
+숫자만 바뀌는 정형 브리핑용 조각 이어붙이기 TTS
+
+    "Total moved {} meters."  +  0.12
+    -> ["Total moved"] + ["zero", "point", "one", "two"] + ["meters."]
+
+- 템플릿의 고정 부분과 숫자 단어는 한 번만 합성해서 PhraseAudioCache(메모리 + 디스크)에 보관
+- 재생할 때는 앞뒤 무음을 잘라 짧은 crossfade로 이어 붙이기만 함 (Kokoro 추론 없음)
+- 등록된 템플릿에 맞지 않는 자유 문장은 render()가 None -> 호출한 쪽에서 전체 합성
+"""
+import re
+
+import numpy as np
+
+ONES = [
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen",
+]
+TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+NUMBER_VOCAB = ONES + TENS[2:] + ["hundred", "point", "minus"]
+
+NUMBER_PATTERN = r"(-?\d+(?:\.\d+)?)"
+CROSSFADE_MS = 10  # 조각 사이 crossfade 길이
+EDGE_PAD_MS = 20  # 무음을 자를 때 앞뒤로 남겨 둘 길이
+SILENCE_THRESHOLD = 0.01
+
+
+def _int_words(n: int):
+    if n < 20:
+        return [ONES[n]]
+    if n < 100:
+        tens, ones = divmod(n, 10)
+        return [TENS[tens]] + ([ONES[ones]] if ones else [])
+    hundreds, rest = divmod(n, 100)
+    return [ONES[hundreds], "hundred"] + (_int_words(rest) if rest else [])
+
+
+def number_words(value: str):
+    """"0.12" -> ["zero", "point", "one", "two"], 1000 이상이면 None (전체 합성으로)"""
+    negative = value.startswith("-")
+    int_part, _, frac = value.lstrip("-").partition(".")
+    n = int(int_part)
+    if n > 999:
+        return None
+    words = (["minus"] if negative else []) + _int_words(n)
+    if frac:
+        words += ["point"] + [ONES[int(d)] for d in frac]
+    return words
+
+
+def trim_silence(audio: np.ndarray, sr: int, threshold: float = SILENCE_THRESHOLD):
+    voiced = np.flatnonzero(np.abs(audio) > threshold)
+    if len(voiced) == 0:
+        return audio
+    pad = int(sr * EDGE_PAD_MS / 1000)
+    return audio[max(voiced[0] - pad, 0):voiced[-1] + pad + 1]
+
+
+def stitch(pieces, sr: int, crossfade_ms: float = CROSSFADE_MS) -> np.ndarray:
+    """조각을 선형 crossfade로 이어 붙임"""
+    n = int(sr * crossfade_ms / 1000)
+    parts = [pieces[0]]
+    for p in pieces[1:]:
+        k = min(n, len(parts[-1]), len(p))
+        if k == 0:
+            parts.append(p)
+            continue
+        fade = np.linspace(0.0, 1.0, k, dtype=np.float32)
+        tail = parts[-1][-k:]
+        parts[-1] = parts[-1][:-k]
+        parts.append(tail * (1.0 - fade) + p[:k] * fade)
+        parts.append(p[k:])
+    return np.concatenate(parts).astype(np.float32)
+
+
+class SegmentTTS:
+    """
+    템플릿 문장 조각 TTS
+    - cache: src.tts_cache.PhraseAudioCache (조각 합성/저장 담당)
+    - add_template("Total moved {} meters."): 고정 조각을 미리 합성, {} 자리에는 숫자
+    """
+
+    def __init__(self, cache, voice: str, speed: float, lang: str):
+        self.cache = cache
+        self.voice, self.speed, self.lang = voice, speed, lang
+        self._templates = []  # (정규식, 고정 조각 리스트)
+        self._trimmed = {}  # 조각 문장 -> (무음 자른 오디오, sr)
+
+    def add_template(self, template: str):
+        fixed = [f.strip() for f in template.split("{}")]
+        body = NUMBER_PATTERN.join(re.escape(f) for f in template.split("{}"))
+        self._templates.append((re.compile(rf"^\s*{body}\s*$"), fixed))
+
+        vocab = NUMBER_VOCAB if len(self._templates) == 1 else []
+        self.cache.prerender([f for f in fixed if f] + vocab, self.voice, self.speed, self.lang)
+
+    def _piece(self, text: str):
+        hit = self._trimmed.get(text)
+        if hit is None:
+            audio, sr = self.cache.get_or_synthesize(text, self.voice, self.speed, self.lang)
+            hit = self._trimmed[text] = (trim_silence(audio, sr), sr)
+        return hit
+
+    def render(self, text: str):
+        """템플릿에 맞으면 (오디오, sr), 아니면 None"""
+        for pattern, fixed in self._templates:
+            m = pattern.match(text)
+            if m is None:
+                continue
+            words = []
+            for i, frag in enumerate(fixed):
+                if frag:
+                    words.append(frag)
+                if i < len(m.groups()):
+                    nums = number_words(m.group(i + 1))
+                    if nums is None:
+                        return None
+                    words += nums
+            pieces = [self._piece(w) for w in words]
+            sr = pieces[0][1]
+            return stitch([p for p, _ in pieces], sr), sr
+        return None
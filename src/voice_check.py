@@ -6,49 +6,90 @@ if not hasattr(torchaudio, 'list_audio_backends'):
     torchaudio.list_audio_backends = lambda: ["soundfile"]
 import os
 import sounddevice as sd
-from scipy.io.wavfile import write
+import torch
+from scipy.io.wavfile import read, write
+from scipy.signal import resample_poly
 from speechbrain.inference.speaker import SpeakerRecognition
 
+from src.model_registry import REGISTRY
+
+ECAPA_SOURCE = "speechbrain/spkrec-ecapa-voxceleb"
+
 
 class SpeakerAuth:
-    def __init__(self, master_file="master_voice.wav", temp_file="temp_input.wav"):
+    def __init__(self, master_file="master_voice.wav", fs=16000):
         self.master_file = master_file
-        self.temp_file = temp_file
+        self.fs = fs
+        self._master = None  # 마스터 음성 (1, samples) 텐서, 처음 verify 때 한 번만 읽음
 
         print("[Auth] 모델을 불러오는 중입니다... (ECAPA-TDNN)")
-        self.verification = SpeakerRecognition.from_hparams(
-            source="speechbrain/spkrec-ecapa-voxceleb",
+        self.registry_key = ("ecapa", ECAPA_SOURCE)
+        self.verification = REGISTRY.acquire(self.registry_key, lambda: SpeakerRecognition.from_hparams(
+            source=ECAPA_SOURCE,
             savedir="pretrained_models/spkrec-ecapa-voxceleb"
-        )
+        ))
         print("[Auth] 모델 로드 완료.")
 
-    def record_audio(self, filename, duration=4, fs=16000):
-        """마이크로 지정된 시간만큼 녹음하여 파일로 저장"""
+    def warmup(self):
+        """1초 잡음으로 임베딩 한 번 (첫 인증의 초기화 지연 제거)"""
+        noise = (np.random.default_rng(0).standard_normal(self.fs) * 0.01).astype(np.float32)
+        with torch.no_grad():
+            self.verification.encode_batch(torch.from_numpy(noise)[None, :])
+
+    def close(self):
+        """공유 모델 참조 반환 (인증이 끝나면 ECAPA는 더 필요 없음)"""
+        if self.registry_key is not None:
+            REGISTRY.release(self.registry_key)
+            self.registry_key = None
+        self.verification = None  # 여기서도 놓아야 실제로 메모리에서 내려감
+
+    def record_audio(self, duration=4):
+        """마이크로 지정된 시간만큼 녹음 -> float32 mono 배열 (실패하면 None)"""
         print(f" {duration}초간 말씀해주세요...")
         try:
-            recording = sd.rec(int(duration * fs), samplerate=fs, channels=1)
+            recording = sd.rec(int(duration * self.fs), samplerate=self.fs, channels=1, dtype="float32")
             sd.wait()  # 녹음 끝날 때까지 대기
-            write(filename, fs, recording)  # wav 파일로 저장
             print("녹음 완료.")
+            return recording[:, 0]
         except Exception as e:
             print(f"[Auth Error] 녹음 중 오류 발생: {e}")
+            return None
+
+    def _load_master(self):
+        """마스터 wav -> (1, samples) 텐서 (verify()가 저장한 float32 wav, 정수형 wav나 다른 샘플레이트도 변환)"""
+        if self._master is None:
+            fs, wav = read(self.master_file)
+            if wav.ndim > 1:
+                wav = wav.mean(axis=1)
+            if np.issubdtype(wav.dtype, np.integer):
+                wav = wav / float(np.iinfo(wav.dtype).max)
+            if fs != self.fs:
+                wav = resample_poly(wav, self.fs, fs)
+            self._master = torch.from_numpy(np.asarray(wav, dtype=np.float32))[None, :]
+        return self._master
 
     def verify(self):
-        """현재 마이크 입력과 마스터 파일 비교"""
+        """현재 마이크 입력과 마스터 음성 비교 (임시 파일 없이 메모리에서 바로)"""
         # 1. 마스터 파일이 없으면 현재 목소리를 마스터로 등록
         if not os.path.exists(self.master_file):
             print("등록된 사용자 목소리가 없습니다.")
             print("최초 사용자를 마스터로 등록합니다.")
-            self.record_audio(self.master_file)
+            recording = self.record_audio()
+            if recording is None:
+                return False, 0.0
+            write(self.master_file, self.fs, recording)  # 다음 실행을 위해 wav로 저장
+            self._master = torch.from_numpy(recording)[None, :]
             return True, 1.0  # 자동 승인
 
-        # 2. 인증을 위한 녹음 (임시 파일)
-        self.record_audio(self.temp_file)
+        # 2. 인증을 위한 녹음
+        recording = self.record_audio()
+        if recording is None:
+            return False, 0.0
 
         try:
-            score, prediction = self.verification.verify_files(
-                self.master_file,
-                self.temp_file
+            score, prediction = self.verification.verify_batch(
+                self._load_master(),
+                torch.from_numpy(recording)[None, :]
             )
 
             similarity = score.item()
@@ -58,4 +99,4 @@ class SpeakerAuth:
 
         except Exception as e:
             print(f"[Auth Error] 검증 중 오류 발생: {e}")
-            return False, 0.0
\ No newline at end of file
+            return False, 0.0
@@ -1,30 +1,68 @@
 import threading
+import numpy as np
 import speech_recognition as sr
-import whisper
-import os
+import sounddevice as sd
 import time
 
-# 감지할 키워드 목록 (한국어, 영어 혼용)
-STOP_KEYWORDS = ["stop", "bad", "turn off", "멈춰", "정지", "위험", "스탑"]
+from src.asr_engine import DEFAULT_ASR_BACKEND, load_asr_engine
+from src.keywords import VOICE_STOP_MATCHER, emergency_hit
+from src.kws import DEFAULT_TEMPLATE_PATH, KeywordSpotter
+from src.robot_safety import RTDE_LOCK, safe_stop
+
+ASR_SAMPLE_RATE = 16000  # 위스퍼 입력 (16kHz mono float32)
 
 
 class VoiceEmergencySystem:
-    def __init__(self, rtde_c, log_callback=None):
+    def __init__(self, rtde_c, log_callback=None, asr_model="tiny", asr_backend=DEFAULT_ASR_BACKEND,
+                 kws_path=DEFAULT_TEMPLATE_PATH, asr_engine=None):
         """
         :param rtde_c: 로봇 제어 객체 (비상시 직접 정지 명령을 내리기 위해 필요)
+        :param asr_backend: "whisper" / "ct2" (CPU int8)
+        :param asr_engine: 미리 로드한 ASR 엔진 (주면 새로 로드하지 않고 그대로 사용, stop()에서 close)
+        :param kws_path: 키워드 스포터 템플릿 (있으면 위스퍼보다 먼저 정지)
         """
         self.rtde_c = rtde_c
         self.log_callback = log_callback
         self.stop_flag = False  # 메인 루프 탈출용 플래그
         self.running = True  # 리스닝 스레드 유지용 플래그
 
-        print("[Voice] Loading Whisper Model (tiny)...")
+        self.model = asr_engine
+        if self.model is None:
+            print(f"[Voice] Loading Whisper Model ({asr_model}, {asr_backend})...")
+            try:
+                # 한/영 키워드를 모두 받으므로 언어는 자동 감지
+                self.model = load_asr_engine(asr_model, backend=asr_backend, language=None)
+                print("[Voice] Model Loaded.")
+            except Exception as e:
+                print(f"[Voice Error] 모델 로드 실패: {e}")
+
+        self.kws = KeywordSpotter.load(kws_path)
+        if self.kws is None:
+            print(f"[Voice] KWS 템플릿 없음 ({kws_path}) - Whisper로만 감시합니다.")
+
+    def _emergency_stop(self):
+        """KWS/위스퍼 경로 공용 정지 (stopL 실패 시 stopJ, 메인 스레드의 이동 명령과 lock 공유)"""
+        with RTDE_LOCK:
+            self.stop_flag = True
+            safe_stop(self.rtde_c)
+
+    def _kws_thread(self):
+        """30ms 청크마다 키워드 스포터 실행 (위스퍼 경로와 별도의 입력 스트림)"""
+        chunk = int(self.kws.sr * 0.03)
         try:
-            self.model = whisper.load_model("tiny")
-            print("[Voice] Model Loaded.")
+            with sd.InputStream(samplerate=self.kws.sr, channels=1, dtype="float32", blocksize=chunk) as stream:
+                while self.running and not self.stop_flag:
+                    data, _ = stream.read(chunk)
+                    hit = self.kws.process(data[:, 0])
+                    if hit:
+                        label, dist = hit
+                        self._emergency_stop()
+                        print(f"[Voice KWS] '{label}' 검출 (dist {dist:.2f})")
+                        if self.log_callback:
+                            self.log_callback(f"로봇 비상 정지 동작 감지 및 실행 (KWS: {label})")
+                        break
         except Exception as e:
-            print(f"[Voice Error] 모델 로드 실패: {e}")
-            self.model = None
+            print(f"[Voice KWS Error] {e}")
 
     def _listening_thread(self):
         """백그라운드에서 실행될 리스닝 로직"""
@@ -33,7 +71,6 @@ class VoiceEmergencySystem:
         r = sr.Recognizer()
         r.energy_threshold = 300
         r.dynamic_energy_threshold = True
-        temp_filename = "temp_voice_command.wav"
 
         with sr.Microphone() as source:
             print("[Voice] Listening for 'STOP' commands...")
@@ -44,13 +81,14 @@ class VoiceEmergencySystem:
                     # 3초 단위로 끊어서 듣기 (너무 길게 들으면 반응 느려짐)
                     audio = r.listen(source, timeout=None, phrase_time_limit=3)
 
-                    with open(temp_filename, "wb") as f:
-                        f.write(audio.get_wav_data())
+                    # 16kHz int16 PCM -> float32 (임시 wav 파일 / ffmpeg 디코딩 없이 바로 위스퍼로)
+                    raw = audio.get_raw_data(convert_rate=ASR_SAMPLE_RATE, convert_width=2)
+                    samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
 
                     start_time = time.time()
 
                     # Whisper로 텍스트 변환
-                    result = self.model.transcribe(temp_filename, fp16=False)
+                    result = self.model.transcribe(samples)
 
                     end_time = time.time()
                     interference_time = end_time - start_time
@@ -60,12 +98,13 @@ class VoiceEmergencySystem:
                         print(f"위스퍼 지연 시간: {interference_time}")
                         print(f"[Voice Heard] '{text}'")
 
-                        # 키워드 매칭 확인
-                        if any(k in text for k in STOP_KEYWORDS):
+                        # 키워드 매칭 확인 (combined.py의 STOP/PAIN 목록 + "bad"/"turn off", src/keywords.py)
+                        hit = emergency_hit(text, VOICE_STOP_MATCHER)
+                        if hit:
                             if self.log_callback:
-                                self.log_callback(f"로봇 비상 정지 동작 감지 및 실행. 위스퍼 지연 시간: {interference_time}")
-                            self.rtde_c.stopL(2.0)
-                            self.stop_flag = True
+                                self.log_callback(f"로봇 비상 정지 동작 감지 및 실행 ('{hit.keyword}'). "
+                                                  f"위스퍼 지연 시간: {interference_time}")
+                            self._emergency_stop()
                             break
 
                 except sr.WaitTimeoutError:
@@ -73,12 +112,6 @@ class VoiceEmergencySystem:
                 except Exception as e:
                     pass
 
-        if os.path.exists(temp_filename):
-            try:
-                os.remove(temp_filename)
-            except:
-                pass
-
     def start(self):
         """감시 시작"""
         if self.model is None:
@@ -89,6 +122,8 @@ class VoiceEmergencySystem:
         self.stop_flag = False
         t = threading.Thread(target=self._listening_thread, daemon=True)
         t.start()
+        if self.kws is not None:
+            threading.Thread(target=self._kws_thread, daemon=True).start()
 
     def is_triggered(self):
         """외부에서 비상 정지가 눌렸는지 확인하는 함수"""
@@ -97,3 +132,6 @@ class VoiceEmergencySystem:
     def stop(self):
         """감시 종료 (프로그램 끝날 때 호출)"""
         self.running = False
+        if self.model is not None:
+            self.model.close()  # 공유 모델 참조 반환
+            self.model = None
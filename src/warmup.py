@@ -0,0 +1,33 @@
+"""
+첫 추론 지연 제거용 warm-up
+
+- 모델마다 warmup()(대표적인 더미 입력으로 추론 한 번)을 두 번 실행해서
+  첫 번째(cold)와 두 번째(warm) 시간을 기록
+- 첫 명령("start", "stop")이 커널 초기화 / 메모리 할당 비용을 떠안지 않도록 "System Ready" 전에 호출
+"""
+import time
+
+
+def warm_up(components: dict, log=None) -> dict:
+    """
+    :param components: {이름: warmup 함수}
+    :param log: log(이름, cold 초, warm 초) (예: metrics CSV 기록)
+    :return: {이름: (cold 초, warm 초)}, 실패한 구성요소는 제외 (warm-up 실패로 시작을 막지 않음)
+    """
+    timings = {}
+    for name, fn in components.items():
+        try:
+            t0 = time.perf_counter()
+            fn()
+            cold = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            fn()
+            warm = time.perf_counter() - t0
+        except Exception as e:
+            print(f"[Warmup] {name} 실패: {e}")
+            continue
+        timings[name] = (cold, warm)
+        print(f"[Warmup] {name:<8} cold {cold * 1000:8.1f} ms -> warm {warm * 1000:8.1f} ms")
+        if log:
+            log(name, cold, warm)
+    return timings
@@ -0,0 +1,65 @@
+import numpy as np
+import whisper
+
+from src.asr_engine import COMMAND_SAMPLE_LEN
+
+# whisper.transcribe()의 무음 판정 기준과 동일
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+
+class ShortCommandDecoder:
+    """
+    짧은 명령어 전용 위스퍼 디코딩 경로
+    - log-mel 한 번 + decode 한 번 (세그먼트/타임스탬프 루프, temperature fallback 없음)
+    - DecodingOptions는 한 번 만들어 재사용 (토크나이저는 whisper 내부 캐시 사용)
+    - 30초보다 긴 입력만 기존 model.transcribe()로 넘김
+    - 반환 형식은 model.transcribe()와 같은 dict (기존 코드의 res.get("text") 그대로 사용)
+    """
+
+    def __init__(self, model, language="en", sample_len: int = COMMAND_SAMPLE_LEN):
+        self.model = model
+        self.language = language
+        self.options = whisper.DecodingOptions(
+            task="transcribe",
+            language=language,
+            temperature=0.0,
+            sample_len=sample_len,
+            without_timestamps=True,
+            fp16=False,
+        )
+        # 토크나이저를 미리 만들어 첫 추론에서 생성 비용이 안 들게 함
+        whisper.tokenizer.get_tokenizer(
+            model.is_multilingual,
+            num_languages=model.num_languages,
+            language=language,
+            task="transcribe",
+        )
+
+    def transcribe(self, audio) -> dict:
+        """audio: float32 16kHz mono 배열 또는 파일 경로"""
+        if isinstance(audio, str):
+            audio = whisper.load_audio(audio)
+        audio = np.asarray(audio, dtype=np.float32)
+
+        if len(audio) > whisper.audio.N_SAMPLES:
+            return self.model.transcribe(
+                audio, language=self.language, fp16=False,
+                beam_size=1, best_of=1, temperature=0.0
+            )
+
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio), self.model.dims.n_mels
+        ).to(self.model.device)
+        result = whisper.decode(self.model, mel, self.options)
+
+        text = result.text
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+            text = ""  # 무음으로 판단
+
+        return {
+            "text": text,
+            "language": result.language,
+            "no_speech_prob": result.no_speech_prob,
+            "avg_logprob": result.avg_logprob,
+        }
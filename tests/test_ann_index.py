@@ -0,0 +1,36 @@
+"""
+IVF 근사 탐색: 군집이 비어 있어도 결과를 돌려줌
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ann_index import IVFIndex, exact_search  # noqa: E402
+
+
+def _emb(n=200, dim=8):
+    emb = np.random.default_rng(0).normal(size=(n, dim)).astype(np.float32)
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+def test_search_skips_empty_lists():
+    emb = _emb()
+    ivf = IVFIndex(emb, n_lists=10, n_probe=2)
+    # 마지막 군집에 모든 예문이 있고 나머지는 비어 있는 경우
+    ivf.counts = np.zeros(10, dtype=np.int64)
+    ivf.counts[-1] = len(emb)
+    ivf.starts = np.zeros(10, dtype=np.int64)
+    rows, _ = ivf.search(emb[0], 5)
+    assert rows.tolist() == exact_search(emb, emb[0], 5)[0].tolist()
+
+
+def test_search_falls_back_to_exact_scan():
+    emb = _emb()
+    ivf = IVFIndex(emb, n_lists=10, n_probe=2)
+    ivf.counts = np.zeros(10, dtype=np.int64)
+    rows, scores = ivf.search(emb[0], 5)
+    assert rows.tolist() == exact_search(emb, emb[0], 5)[0].tolist()
+    assert np.all(np.diff(scores) <= 0)
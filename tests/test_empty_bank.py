@@ -0,0 +1,67 @@
+"""
+빈 인텐트 뱅크 처리 (인코더 없이 가짜 인코더로 확인)
+"""
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# minilm.py는 루트에 있지만 src.minilm으로 import 됨
+_spec = importlib.util.spec_from_file_location("src.minilm", os.path.join(ROOT, "minilm.py"))
+minilm = sys.modules.setdefault("src.minilm", importlib.util.module_from_spec(_spec))
+if not hasattr(minilm, "MiniLMRetriever"):
+    _spec.loader.exec_module(minilm)
+
+from src.embedding_cache import EmbeddingCache  # noqa: E402
+from src.intent_index import IntentIndex  # noqa: E402
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        emb = np.array([[len(t), sum(map(ord, t)) % 31, 1.0] for t in texts], dtype=np.float32)
+        emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+        return emb[0] if single else emb
+
+
+@pytest.fixture
+def encoder(monkeypatch):
+    enc = FakeEncoder()
+    monkeypatch.setattr(minilm, "load_encoder", lambda backend="torch": enc)
+    return enc
+
+
+def test_retriever_rejects_empty_bank(encoder, tmp_path):
+    with pytest.raises(ValueError, match="비어"):
+        minilm.MiniLMRetriever([], cache_path=str(tmp_path / "bank.emb.npz"))
+    assert encoder.calls == 0
+
+
+def test_update_to_empty_bank_keeps_old_bank(encoder):
+    retriever = minilm.MiniLMRetriever([{"intent": "STOP", "text": "stop"}])
+    with pytest.raises(ValueError):
+        retriever.update_bank([])
+    assert retriever.retrieve_topk("stop", k=1)[0]["intent"] == "STOP"
+
+
+def test_intent_index_rejects_empty_bank():
+    with pytest.raises(ValueError):
+        IntentIndex(np.zeros((0, 3), dtype=np.float32), [], [])
+
+
+def test_cache_does_not_encode_empty_keys(tmp_path):
+    def encode_fn(texts):
+        raise AssertionError("빈 목록은 인코딩하지 않아야 함")
+
+    cache = EmbeddingCache(str(tmp_path / "bank.emb.npz"), "fake")
+    assert cache.get_or_encode([], encode_fn).shape[0] == 0
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+from typing import Iterator
+
 import numpy as np
 from kokoro import KPipeline
 
+# KPipeline 기본값은 줄바꿈에서만 나누므로, 문장 단위로 나눠서 첫 문장부터 바로 내보냄
+SENTENCE_SPLIT = r"(?<=[.!?])\s+|\n+"
+
 
 class KokoroTTS:
     """
@@ -40,3 +45,16 @@ class KokoroTTS:
 
         out = np.concatenate(chunks, axis=0).astype(np.float32)
         return out, self.sr
+
+    def synthesize_stream(self, text: str) -> Iterator[np.ndarray]:
+        """
+        문장 단위로 합성되는 대로 float32 청크를 내보냄 (샘플레이트는 self.sr)
+        - audio_out.play_stream()과 같이 쓰면 첫 문장이 나오자마자 재생 시작
+        """
+        if not text.strip():
+            text = " "
+
+        for _, _, audio in self.pipeline(text, voice=self.voice, split_pattern=SENTENCE_SPLIT):
+            if audio is None or len(audio) == 0:
+                continue
+            yield np.asarray(audio, dtype=np.float32)